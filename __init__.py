@@ -14,6 +14,8 @@ import importlib
 
 
 module_names = (
+    "utils.render",
+    "utils.session",
     "operators.operators",
     "operators.material",
     "operators.marmoset",
@@ -0,0 +1,42 @@
+"""Generate the node group library bundled with GrabDoc.
+
+Run with the lowest Blender version the add-on supports, as newer
+versions can open the library but older versions may not:
+
+    blender -b --factory-startup --python assets/build_node_library.py
+
+The node groups are built from a fresh factory scene, so the library
+only ever stores default values & never scene or user edits."""
+
+import os
+import sys
+import importlib
+
+import bpy
+
+
+def main() -> None:
+    addon_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, os.path.dirname(addon_path))
+    package = os.path.basename(addon_path)
+    addon = importlib.import_module(package)
+    node = importlib.import_module(f"{package}.utils.node")
+
+    addon.register()
+    try:
+        node.build_node_groups()
+        groups = set()
+        for name in node.NODE_GROUP_NAMES:
+            tree = bpy.data.node_groups[name]
+            tree[node.LIBRARY_VERSION_PROP] = node.NODE_LIBRARY_VERSION
+            tree[node.LIBRARY_BLENDER_VERSION_PROP] = bpy.app.version
+            groups.add(tree)
+        path = node.get_node_library_path()
+        bpy.data.libraries.write(path, groups, fake_user=True)
+        print(f"GrabDoc: Wrote node group library to {path}")
+    finally:
+        addon.unregister()
+
+
+if __name__ == "__main__":
+    main()
@@ -51,6 +51,7 @@ class Global:
     EMISSIVE_NODE  = PREFIX + EMISSIVE_NAME
     ROUGHNESS_NODE = PREFIX + ROUGHNESS_NAME
     METALLIC_NODE = PREFIX + METALLIC_NAME
+    SWITCH_NODE    = PREFIX + "Map Switch"
 
     ALL_MAP_IDS = (
         NORMAL_ID,
@@ -89,6 +90,20 @@ class Global:
         OCCLUSION_NODE
     )
 
+    # NOTE: Maps that can be split out of a single
+    # render through shader AOVs / render passes
+    AOV_MAP_IDS = (
+        COLOR_ID,
+        EMISSIVE_ID,
+        ROUGHNESS_ID,
+        METALLIC_ID,
+        NORMAL_ID,
+        HEIGHT_ID,
+        ALPHA_ID,
+        OCCLUSION_ID
+    )
+    AOV_SOCKET_NAME = "AOV"
+
     INVALID_BAKE_TYPES = (
         'EMPTY',
         'VOLUME',
@@ -159,3 +174,5 @@ class Error:
         "Offline render completed!"
     EXPORT_COMPLETE = \
         "Export completed!"
+    EXPORT_RUNNING = \
+        "Cannot run while maps are being exported"
@@ -14,6 +14,7 @@ from ..utils.generic import (
     get_create_addon_temp_dir
 )
 from ..utils.render import set_guide_height, get_rendered_objects
+from .operators import GRABDOC_OT_export_maps
 
 
 ################################################
@@ -38,6 +39,8 @@ class GrabDoc_OT_send_to_marmo(OpInfo, Operator):
 
     @classmethod
     def poll(cls, context: Context) -> bool:
+        if GRABDOC_OT_export_maps.is_running:
+            return False
         package = __package__.split('.', maxsplit=1)[0]
         return os.path.exists(
             context.preferences.addons[package].preferences.marmo_executable
@@ -138,7 +141,7 @@ class GrabDoc_OT_send_to_marmo(OpInfo, Operator):
         rendered_obs = get_rendered_objects()
         gd = context.scene.gd
         if gd.height[0].enabled and gd.height[0].method == 'AUTO':
-            set_guide_height(rendered_obs)
+            set_guide_height()
 
         # Attach _high suffix to all user assets
         # NOTE: Only supports single bake group for now
@@ -1,20 +1,26 @@
 import os
 import time
+from concurrent.futures import Future
 import numpy
 
 import bpy
 import blf
 from bpy.types import SpaceView3D, Event, Context, Operator, UILayout
-from bpy.props import StringProperty
+from bpy.props import StringProperty, IntProperty
 
 from ..constants import Global, Error
 from ..utils.render import get_rendered_objects
-from ..utils.node import apply_node_to_objects, node_cleanup
-from ..utils.scene import scene_setup, remove_setup
+from ..utils.node import get_material_index
+from ..utils.scene import (
+    scene_setup,
+    remove_setup,
+    flush_pending_scene_update
+)
 from ..utils.generic import (
     OpInfo,
     get_format,
     proper_scene_setup,
+    set_if_changed,
     bad_setup_check,
     export_plane,
     is_camera_in_3d_view,
@@ -22,12 +28,46 @@ from ..utils.generic import (
     get_create_addon_temp_dir
 )
 from ..utils.baker import (
-    baker_init,
     get_bake_maps,
-    baker_cleanup,
     get_bakers,
     reimport_as_material
 )
+from ..utils.session import begin_session, release_session, end_session
+from ..utils.aov import (
+    aov_init,
+    aov_render,
+    aov_cleanup,
+    get_aov_bake_maps
+)
+from ..utils.tiles import render_tiled, is_tiled_render_supported
+from ..utils.pack import (
+    pack_channels_streaming,
+    is_streaming_pack_supported,
+    get_png_compression,
+    pack_buffers
+)
+from ..utils.buffer import (
+    render_to_buffer,
+    can_render_to_buffer,
+    set_render_image,
+    show_image,
+    BufferWriter
+)
+from ..utils.trace import span, start_trace, end_trace
+from ..utils.cache import (
+    get_objects_hash,
+    get_map_hash,
+    get_map_file_name,
+    is_map_cached,
+    load_cache_manifest,
+    save_cache_manifest
+)
+from ..utils.worker import (
+    start_export_workers,
+    gather_worker_outputs,
+    remove_worker_temp_dir,
+    stop_export_workers
+)
 
 
 ################################################
@@ -100,7 +140,14 @@ know how to properly revert"""
     bl_idname = "grab_doc.setup_scene"
     bl_label = "Setup / Refresh GrabDoc Scene"
 
+    @classmethod
+    def poll(cls, context: Context) -> bool:
+        return not GRABDOC_OT_export_maps.is_running or poll_message_error(
+            cls, Error.EXPORT_RUNNING, print_err_line=False
+        )
+
     def execute(self, context: Context):
+        end_session(context)
         scene_setup(self, context)
         return {'FINISHED'}
 
@@ -111,7 +158,14 @@ scene, not including images reimported after bakes"""
     bl_idname = "grab_doc.remove_setup"
     bl_label = "Remove Setup"
 
+    @classmethod
+    def poll(cls, context: Context) -> bool:
+        return not GRABDOC_OT_export_maps.is_running or poll_message_error(
+            cls, Error.EXPORT_RUNNING, print_err_line=False
+        )
+
     def execute(self, context: Context):
+        end_session(context)
         remove_setup(context)
         return {'FINISHED'}
 
@@ -127,111 +181,549 @@ class GRABDOC_OT_export_maps(OpInfo, Operator, UILayout):
     bl_label = "Export Maps"
     bl_options = {'INTERNAL'}
 
-    progress_factor = 0.0
+    # NOTE: Comma separated subset of map IDs, used by export workers
+    map_ids: StringProperty(options={'HIDDEN'})
+    # NOTE: File finished maps are appended to, used by export workers
+    progress_path: StringProperty(options={'HIDDEN'})
+
+    # NOTE: Set while a modal export is stepping through maps
+    is_running = False
 
     @classmethod
     def poll(cls, context: Context) -> bool:
-        return not context.scene.gd.preview_state
+        return not context.scene.gd.preview_state and not cls.is_running
 
     @staticmethod
-    def export(context: Context, suffix: str, path: str = None) -> str:
+    def get_export_path(context: Context, suffix: str, path: str = None) -> str:
         gd = context.scene.gd
-        render = context.scene.render
-        saved_path = render.filepath
-
         name = f"{gd.export_name}_{suffix}"
         if path is None:
             path = bpy.path.abspath(gd.export_path)
-        path = os.path.join(path, name + get_format())
-        render.filepath = path
+        return os.path.join(path, name + get_format())
+
+    @staticmethod
+    def use_tiled_render(context: Context) -> bool:
+        gd = context.scene.gd
+        render = context.scene.render
+        return gd.use_tiled_export and is_tiled_render_supported() \
+            and max(render.resolution_x, render.resolution_y) > gd.tile_size
 
+    @staticmethod
+    def export(context: Context, suffix: str, path: str = None) -> str:
+        gd = context.scene.gd
+
+        path = GRABDOC_OT_export_maps.get_export_path(context, suffix, path)
         context.scene.camera = bpy.data.objects[Global.TRIM_CAMERA_NAME]
 
-        bpy.ops.render.render(write_still=True)
-        render.filepath = saved_path
+        # Render large maps in tiles to bound memory usage
+        if GRABDOC_OT_export_maps.use_tiled_render(context):
+            with span("render tiled", suffix=suffix):
+                return render_tiled(context, path, gd.tile_size)
+
+        with span("render", suffix=suffix):
+            bpy.ops.render.render()
+        with span("file write", suffix=suffix):
+            bpy.data.images["Render Result"].save_render(
+                filepath=path, scene=context.scene
+            )
         return path
 
-    def execute(self, context: Context):
+    def export_to_buffer(
+            self, context: Context, bake_map, keep: bool=False
+        ) -> Future | None:
+        """Render a map into memory and hand its file to the background
+        writers. Kept maps are stored for packing and only written
+        if their own file is still wanted. Returns the pending write"""
         gd = context.scene.gd
+        with span("render", suffix=bake_map.suffix):
+            pixels = render_to_buffer(context, bake_map)
+        if keep:
+            self.pack_pixels[bake_map.ID] = pixels
+            if gd.remove_original_maps and not bake_map.reimport:
+                return
+        path = self.get_export_path(context, bake_map.suffix)
+        if self.writer is not None:
+            is_srgb = bake_map.VIEW_TRANSFORM == 'Standard' \
+                and gd.format != 'OPEN_EXR'
+            return self.writer.submit(
+                pixels, path, 'sRGB' if is_srgb else None
+            )
+        with span("file write", suffix=bake_map.suffix):
+            bpy.data.images["Render Result"].save_render(
+                filepath=path, scene=context.scene
+            )
+        return None
+
+    def report_progress(self, map_id: str) -> None:
+        """Record a map whose file is completely written. Also
+        called from writer threads, so no Blender data is used"""
+        if self.progress_file is None:
+            return
+        with open(self.progress_file, "a", encoding='utf-8') as file:
+            file.write(map_id + "\n")
+
+    def report_write_progress(self, future: Future, map_id: str) -> None:
+        if future.exception() is None:
+            self.report_progress(map_id)
+
+    def pack_from_buffers(self, context: Context) -> None:
+        gd = context.scene.gd
+        for pack_name, channels in get_pack_layouts(context):
+            buffers = [
+                (self.pack_pixels[map_id], channel)
+                for map_id, channel in channels
+            ]
+            path = os.path.join(
+                bpy.path.abspath(gd.export_path),
+                f"{gd.export_name}_{pack_name}{get_format()}"
+            )
+            pack_buffers(context, buffers, path)
+        self.pack_pixels.clear()
+        GRABDOC_OT_pack_maps.remove_original_maps(context)
+
+    def export_aov(
+            self, context: Context, bake_maps: list, objects: set
+        ) -> list[str]:
+        """Export all given bake maps through a single AOV render"""
+        for bake_map in bake_maps:
+            with span("Baker.setup", map=bake_map.ID):
+                bake_map.setup()
+        with span("aov_init"):
+            aov_init(self, context, bake_maps, objects)
+        with span("render", suffix="AOV"):
+            paths = aov_render(self, context, bake_maps)
+        with span("aov_cleanup"):
+            aov_cleanup(self, context)
+        # NOTE: Setups can overlap, so revert them in reverse
+        for bake_map in reversed(bake_maps):
+            with span("Baker.cleanup", map=bake_map.ID):
+                bake_map.cleanup()
+        return paths
+
+    def export_begin(self, context: Context) -> bool:
+        """Check the setup, begin the bake session & export everything
+        that is not rendered per map. Returns False on failure"""
+        gd = context.scene.gd
+        flush_pending_scene_update()
         report_value, report_string = \
             bad_setup_check(context, active_export=True)
         if report_value:
             self.report({'ERROR'}, report_string)
-            return {'CANCELLED'}
+            return False
         if gd.use_pack_maps is True and not is_pack_maps_enabled():
             self.report(
                 {'ERROR'},
                 "Map packing enabled but incorrect export maps enabled"
             )
-            return {'CANCELLED'}
+            return False
 
-        self.map_name = 'export'
+        if gd.use_tiled_export and not is_tiled_render_supported():
+            self.report(
+                {'WARNING'},
+                "OpenImageIO not found, exporting without tiled rendering"
+            )
 
-        bake_maps = get_bake_maps()
+        self.map_name = 'export'
 
-        start = time.time()
-        context.window_manager.progress_begin(0, 9999)
-        completion_step = 100 / (1 + len(bake_maps))
-        completion_percent = 0
+        self.bake_maps = get_bake_maps(
+            map_ids=self.map_ids.split(',') if self.map_ids else None
+        )
 
-        baker_init(self, context)
+        self.start = time.time()
+        if gd.use_export_trace:
+            start_trace()
+
+        # NOTE: Everything `export_cancel` reverts, so it
+        # can run wherever the rest of the setup fails
+        self.active_map = None
+        self.active_selected = False
+        self.writer = None
+        self.map_hashes = {}
+        self.pack_pixels = {}
+        self.map_count = len(self.bake_maps)
+        self.exported_count = 0
+        # NOTE: Read from writer threads, which can't access properties
+        self.progress_file = self.progress_path or None
+
+        self.session = begin_session(context)
+        try:
+            self.export_setup(context)
+        except Exception:
+            self.export_cancel(context)
+            raise
+        return True
 
-        active_selected = False
+    def export_setup(self, context: Context) -> None:
+        """Prepare the scene & export everything not rendered per map"""
+        gd = context.scene.gd
         if context.object:
-            activeCallback = context.object.name
-            modeCallback = context.object.mode
+            self.active_callback = context.object.name
+            self.mode_callback = context.object.mode
             if bpy.ops.object.mode_set.poll():
                 bpy.ops.object.mode_set(mode='OBJECT')
-            active_selected = True
+            self.active_selected = True
 
         # Scale up BG Plane (helps overscan & border pixels)
         plane_ob = bpy.data.objects[Global.BG_PLANE_NAME]
         plane_ob.scale[0] = plane_ob.scale[1] = 3
 
-        rendered_objects = get_rendered_objects()
-        for bake_map in bake_maps:
-            bake_map.setup()
-            if bake_map.NODE:
-                result = apply_node_to_objects(bake_map.NODE, rendered_objects)
-                if result is False:
-                    self.report({'INFO'}, Error.MAT_SLOTS_WITHOUT_LINKS)
+        with span("get_rendered_objects"):
+            self.rendered_objects = get_rendered_objects()
+
+        # Skip maps whose inputs are unchanged since the last export
+        self.cached_maps = []
+        if gd.use_export_cache:
+            with span("cache hash"):
+                self.manifest = load_cache_manifest(context)
+                objects_hash = \
+                    get_objects_hash(context, self.rendered_objects)
+                for bake_map in self.bake_maps:
+                    map_hash = get_map_hash(context, bake_map, objects_hash)
+                    if is_map_cached(
+                        context, bake_map, self.manifest, map_hash
+                    ):
+                        self.cached_maps.append(bake_map)
+                        continue
+                    self.map_hashes[get_map_file_name(context, bake_map)] = \
+                        map_hash
+        self.render_maps = [
+            bake_map for bake_map in self.bake_maps
+            if bake_map not in self.cached_maps
+        ]
+
+        # Progress counts maps, so AOV & cached maps complete at once
+        self.exported_count = len(self.cached_maps)
+        self.step_times = []
+        context.window_manager.progress_begin(0, self.map_count)
+        context.window_manager.progress_update(self.exported_count)
+
+        # Render shader driven maps at once if requested
+        if gd.use_aov_export:
+            aov_maps = get_aov_bake_maps(self.render_maps)
+            if len(aov_maps) > 1:
+                self.render_maps = [
+                    bake_map for bake_map in self.render_maps
+                    if bake_map not in aov_maps
+                ]
+                self.export_aov(context, aov_maps, self.rendered_objects)
+                for bake_map in aov_maps:
+                    self.report_progress(bake_map.ID)
+                self.exported_count += len(aov_maps)
+                context.window_manager.progress_update(self.exported_count)
+
+        # Keep packed channels in memory if all of them are rendered here
+        self.pack_ids = get_pack_map_ids(context)
+        self.use_pack_buffers = gd.use_pack_maps and all(
+            any(bake_map.ID == map_id and can_render_to_buffer(bake_map)
+                for bake_map in self.render_maps)
+            for map_id in self.pack_ids
+        )
 
+        # Encode & write files while the next map renders
+        if BufferWriter.is_supported(context) \
+        and not self.use_tiled_render(context):
+            self.writer = BufferWriter(context)
+
+        # NOTE: Shared by all maps, so each material is resolved once
+        self.material_index = get_material_index(self.rendered_objects)
+
+        # Wire every material once and switch maps by index
+        self.use_switch = gd.use_map_switch \
+            and any(bake_map.NODE for bake_map in self.render_maps)
+
+    def export_step(self, context: Context, bake_map) -> None:
+        """Set up, render & clean up a single bake map"""
+        step_start = time.time()
+        self.active_map = bake_map
+        result = self.session.set_map(
+            bake_map,
+            self.rendered_objects,
+            self.use_switch,
+            self.material_index
+        )
+        if result is False:
+            self.report({'INFO'}, Error.MAT_SLOTS_WITHOUT_LINKS)
+
+        keep = self.use_pack_buffers and bake_map.ID in self.pack_ids
+        future = None
+        if can_render_to_buffer(bake_map) \
+        and (keep or self.writer is not None):
+            future = self.export_to_buffer(context, bake_map, keep)
+        else:
             self.export(context, bake_map.suffix)
-            bake_map.cleanup()
-            if bake_map.NODE:
-                node_cleanup(bake_map.NODE)
+        self.active_map = None
+        if future is None:
+            self.report_progress(bake_map.ID)
+        else:
+            future.add_done_callback(
+                lambda future, map_id=bake_map.ID:
+                    self.report_write_progress(future, map_id)
+            )
+
+        self.exported_count += 1
+        self.step_times.append(time.time() - step_start)
+        context.window_manager.progress_update(self.exported_count)
+
+    def restore_scene(self, context: Context) -> None:
+        """Revert everything set up by `export_begin`"""
+        self.session.release_map()
+        self.active_map = None
+
+        # NOTE: Written files are read back from here on
+        if self.writer is not None:
+            with span("drain writers"):
+                write_errors = self.writer.drain()
+            self.writer = None
+            for path, error in write_errors:
+                self.map_hashes.pop(os.path.basename(path), None)
+                self.report({'ERROR'}, f"Failed to write {path}: {error}")
+
+        release_session(context, self.session)
+
+        plane_ob = bpy.data.objects.get(Global.BG_PLANE_NAME)
+        if plane_ob is not None:
+            plane_ob.scale[0] = plane_ob.scale[1] = 1
+
+        if self.active_selected:
+            context.view_layer.objects.active = \
+                bpy.data.objects[self.active_callback]
+            if bpy.ops.object.mode_set.poll():
+                bpy.ops.object.mode_set(mode=self.mode_callback)
+        context.window_manager.progress_end()
+
+    def export_end(self, context: Context) -> None:
+        gd = context.scene.gd
+        self.restore_scene(context)
 
-            completion_percent += completion_step
-            context.window_manager.progress_update(completion_percent)
+        if gd.use_export_cache:
+            self.manifest.update(self.map_hashes)
+            save_cache_manifest(context, self.manifest)
 
         # Reimport textures to render result material
-        map_names = [bake.ID for bake in bake_maps if bake.reimport]
-        reimport_as_material(map_names)
+        map_names = [bake.ID for bake in self.bake_maps if bake.reimport]
+        with span("reimport_as_material"):
+            reimport_as_material(map_names)
 
-        # Refresh all original settings
-        baker_cleanup(self, context)
+        if gd.export_plane:
+            with span("export_plane"):
+                export_plane(context)
 
-        plane_ob = bpy.data.objects[Global.BG_PLANE_NAME]
-        plane_ob.scale[0] = plane_ob.scale[1] = 1
+        if self.cached_maps:
+            self.report(
+                {'INFO'}, f"Skipped {len(self.cached_maps)} unchanged map(s)"
+            )
+
+        exc_time = round(time.time() - self.start, 2)
+        self.report(
+            {'INFO'}, f"{Error.EXPORT_COMPLETE} (execution time: {exc_time}s)"
+        )
+
+        if gd.use_pack_maps is True and self.use_pack_buffers:
+            with span("pack_maps"):
+                self.pack_from_buffers(context)
+        elif gd.use_pack_maps is True:
+            with span("pack_maps"):
+                bpy.ops.grab_doc.pack_maps()
+        self.end_trace(context)
+
+    def export_cancel(self, context: Context) -> None:
+        """Restore the scene after an interrupted export. Maps that
+        finished are kept, but nothing is packed, cached or reimported"""
+        self.restore_scene(context)
+        self.pack_pixels.clear()
+        self.end_trace(context)
+        self.report(
+            {'WARNING'},
+            f"Export cancelled ({self.exported_count}/{self.map_count} maps)"
+        )
+
+    def end_trace(self, context: Context) -> None:
+        gd = context.scene.gd
+        if not gd.use_export_trace:
+            return
+        trace_path = os.path.join(
+            bpy.path.abspath(gd.export_path),
+            f"{gd.export_name}_trace.json"
+        )
+        end_trace(trace_path)
+        self.report({'INFO'}, f"Export trace written to {trace_path}")
+
+    def get_eta(self) -> float | None:
+        """Estimated seconds left from the average time per map"""
+        if not self.step_times:
+            return None
+        remaining = self.map_count - self.exported_count
+        return remaining * sum(self.step_times) / len(self.step_times)
+
+    def set_status(self, context: Context) -> None:
+        text = f"Exporting maps {self.exported_count}/{self.map_count}"
+        if self.render_maps:
+            text += f", next: {self.render_maps[0].NAME}"
+        eta = self.get_eta()
+        if eta is not None:
+            text += f", about {round(eta)}s left"
+        context.workspace.status_text_set(f"{text} (Esc to cancel)")
+
+    def execute(self, context: Context):
+        if not self.export_begin(context):
+            return {'CANCELLED'}
+        try:
+            for bake_map in self.render_maps:
+                self.export_step(context, bake_map)
+        except Exception:
+            self.export_cancel(context)
+            raise
+        self.export_end(context)
+        return {'FINISHED'}
+
+    def invoke(self, context: Context, _event: Event):
+        if not self.export_begin(context):
+            return {'CANCELLED'}
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(.01, window=context.window)
+        wm.modal_handler_add(self)
+        GRABDOC_OT_export_maps.is_running = True
+        self.set_status(context)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context: Context, event: Event):
+        if event.type == 'ESC' and event.value == 'PRESS':
+            self.modal_finish(context)
+            self.export_cancel(context)
+            return {'CANCELLED'}
+        # NOTE: Undo & redo would revert the scene mid export
+        if event.type == 'Z' and (event.ctrl or event.oskey):
+            return {'RUNNING_MODAL'}
+        # NOTE: Undone or redone through the menu anyway
+        if self.session.is_interrupted:
+            self.modal_finish(context)
+            self.export_cancel(context)
+            return {'CANCELLED'}
+        if event.type != 'TIMER' or event.timer != self._timer:
+            return {'PASS_THROUGH'}
+
+        # NOTE: One map per timer event so the UI redraws between maps
+        if self.render_maps:
+            try:
+                self.export_step(context, self.render_maps.pop(0))
+            except Exception:
+                self.modal_finish(context)
+                self.export_cancel(context)
+                raise
+            self.set_status(context)
+            return {'RUNNING_MODAL'}
+
+        self.modal_finish(context)
+        self.export_end(context)
+        return {'FINISHED'}
+
+    def modal_finish(self, context: Context) -> None:
+        GRABDOC_OT_export_maps.is_running = False
+        context.window_manager.event_timer_remove(self._timer)
+        context.workspace.status_text_set(None)
+
+
+class GRABDOC_OT_export_maps_parallel(Operator):
+    """Export all enabled bake maps across multiple
+background Blender processes while the UI stays usable"""
+    bl_idname = "grab_doc.export_maps_parallel"
+    bl_label = "Export Maps (Parallel)"
+    bl_options = {'INTERNAL'}
+
+    @classmethod
+    def poll(cls, context: Context) -> bool:
+        return not context.scene.gd.preview_state \
+            and not GRABDOC_OT_export_maps.is_running
+
+    def execute(self, context: Context):
+        gd = context.scene.gd
+        report_value, report_string = \
+            bad_setup_check(context, active_export=True)
+        if report_value:
+            self.report({'ERROR'}, report_string)
+            return {'CANCELLED'}
+        if gd.use_pack_maps is True and not is_pack_maps_enabled():
+            self.report(
+                {'ERROR'},
+                "Map packing enabled but incorrect export maps enabled"
+            )
+            return {'CANCELLED'}
+
+        self.start = time.time()
+        self.bake_maps = get_bake_maps()
+        self.map_count = len(self.bake_maps)
+        self.workers = start_export_workers(
+            context, self.bake_maps, gd.export_workers, gd.worker_threads
+        )
+
+        wm = context.window_manager
+        wm.progress_begin(0, self.map_count)
+        self._timer = wm.event_timer_add(.5, window=context.window)
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context: Context, event: Event):
+        if event.type == 'ESC' and event.value == 'PRESS':
+            self.cancel(context)
+            self.report({'WARNING'}, "Parallel export cancelled")
+            return {'CANCELLED'}
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        # NOTE: Files may still be written, so workers report finished maps
+        exported_count = sum(
+            len(worker.completed_maps()) for worker in self.workers
+        )
+        context.window_manager.progress_update(exported_count)
+        if any(worker.is_running() for worker in self.workers):
+            return {'PASS_THROUGH'}
+
+        self.finish(context)
+        return {'FINISHED'}
+
+    def end_modal(self, context: Context) -> None:
+        wm = context.window_manager
+        wm.event_timer_remove(self._timer)
+        wm.progress_end()
+
+    def cancel(self, context: Context) -> None:
+        """Also called by Blender when the modal is interrupted,
+        e.g. by loading a file or closing the window"""
+        self.end_modal(context)
+        stop_export_workers(self.workers)
+
+    def finish(self, context: Context) -> None:
+        gd = context.scene.gd
+        self.end_modal(context)
+
+        gather_worker_outputs(context, self.workers)
+        failed_maps = [
+            map_id for worker in self.workers
+            if not worker.succeeded() for map_id in worker.map_ids
+        ]
+        if failed_maps:
+            self.report(
+                {'ERROR'},
+                f"Export failed for: {', '.join(failed_maps)} "
+                f"(see logs in {os.path.dirname(self.workers[0].log_path)})"
+            )
+            return
+        remove_worker_temp_dir()
+
+        # Reimport textures to render result material
+        map_names = [bake.ID for bake in self.bake_maps if bake.reimport]
+        reimport_as_material(map_names)
 
         if gd.export_plane:
             export_plane(context)
 
-        if active_selected:
-            context.view_layer.objects.active = bpy.data.objects[activeCallback]
-            if bpy.ops.object.mode_set.poll():
-                bpy.ops.object.mode_set(mode=modeCallback)
-
-        end = time.time()
-        exc_time = round(end - start, 2)
+        exc_time = round(time.time() - self.start, 2)
         self.report(
             {'INFO'}, f"{Error.EXPORT_COMPLETE} (execution time: {exc_time}s)"
         )
-        context.window_manager.progress_end()
 
         if gd.use_pack_maps is True:
             bpy.ops.grab_doc.pack_maps()
-        return {'FINISHED'}
 
 
 class GRABDOC_OT_single_render(OpInfo, Operator):
@@ -249,18 +741,41 @@ class GRABDOC_OT_single_render(OpInfo, Operator):
 
     @classmethod
     def poll(cls, context: Context) -> bool:
+        if GRABDOC_OT_export_maps.is_running:
+            return poll_message_error(
+                cls, Error.EXPORT_RUNNING, print_err_line=False
+            )
         return True if not context.scene.gd.preview_state else poll_message_error(
             cls, "Cannot render, in a Modal State"
         )
 
-    def open_render_image(self, filepath: str):
-        new_image = bpy.data.images.load(filepath, check_existing=True)
-        bpy.ops.screen.userpref_show("INVOKE_DEFAULT")
-        area = bpy.context.window_manager.windows[-1].screen.areas[0]
-        area.type = "IMAGE_EDITOR"
-        area.spaces.active.image = new_image
+    def render_image(self, context: Context):
+        """Render into the persistent single render image, only
+        round tripping through a file for looks not applied by hand"""
+        if can_render_to_buffer(self.baker):
+            pixels = render_to_buffer(context, self.baker, linear=False)
+            colorspace = 'sRGB' \
+                if self.baker.VIEW_TRANSFORM == 'Standard' else 'Non-Color'
+            return set_render_image(pixels, colorspace)
+
+        path = GRABDOC_OT_export_maps.export(
+            context, self.baker.suffix, path=get_create_addon_temp_dir()[1]
+        )
+        file_image = bpy.data.images.load(path)
+        width, height = file_image.size
+        pixels = numpy.empty(width * height * 4, dtype=numpy.float32)
+        file_image.pixels.foreach_get(pixels)
+        # NOTE: Float images (16 bit PNG, EXR) read back scene linear
+        is_float = file_image.is_float
+        colorspace = None if is_float else file_image.colorspace_settings.name
+        bpy.data.images.remove(file_image)
+        os.remove(path)
+        return set_render_image(
+            pixels.reshape(height, width, 4), colorspace, float_buffer=is_float
+        )
 
     def execute(self, context: Context):
+        flush_pending_scene_update()
         report_value, report_string = \
             bad_setup_check(context, active_export=False)
         if report_value:
@@ -280,30 +795,23 @@ class GRABDOC_OT_single_render(OpInfo, Operator):
         plane_ob = bpy.data.objects[Global.BG_PLANE_NAME]
         plane_ob.scale[0] = plane_ob.scale[1] = 3
 
-        baker_init(self, context)
+        session = begin_session(context)
 
         gd = context.scene.gd
         self.baker = getattr(gd, self.map_name)[0]
-        self.baker.setup()
-        if self.baker.NODE:
-            result = apply_node_to_objects(
-                self.baker.NODE, get_rendered_objects()
-            )
-            if result is False:
-                self.report({'INFO'}, Error.MAT_SLOTS_WITHOUT_LINKS)
-        path = GRABDOC_OT_export_maps.export(
-            context, self.baker.suffix, path=get_create_addon_temp_dir()[1]
-        )
-        self.open_render_image(path)
-        self.baker.cleanup()
-        if self.baker.NODE:
-            node_cleanup(self.baker.NODE)
+        result = session.set_map(self.baker, get_rendered_objects())
+        if result is False:
+            self.report({'INFO'}, Error.MAT_SLOTS_WITHOUT_LINKS)
+        try:
+            show_image(self.render_image(context))
+        finally:
+            session.release_map()
 
         # Reimport textures to render result material
         if self.baker.reimport:
             reimport_as_material([self.baker.ID])
 
-        baker_cleanup(self, context)
+        release_session(context, session)
 
         plane_ob = bpy.data.objects[Global.BG_PLANE_NAME]
         plane_ob.scale[0] = plane_ob.scale[1] = 1
@@ -348,6 +856,10 @@ class GRABDOC_OT_map_preview_warning(OpInfo, Operator):
 
     map_name: StringProperty()
 
+    @classmethod
+    def poll(cls, context: Context) -> bool:
+        return GRABDOC_OT_map_preview.poll(context)
+
     def invoke(self, context: Context, _event: Event):
         return context.window_manager.invoke_props_dialog(self, width=525)
 
@@ -399,6 +911,21 @@ def draw_callback_px(self, context: Context) -> None:
     blf.draw(font_id, "You are in Map Preview mode!")
 
 
+def preview_settings_notify(self) -> None:
+    """Message bus callbacks also need to be outside
+    of the class to be passed the operator instance"""
+    if bpy.context.scene.gd.preview_state:
+        self.apply_preview_settings(bpy.context)
+
+
+def preview_type_notify(self) -> None:
+    """Switch previewed map, only swapping the map deltas"""
+    gd = bpy.context.scene.gd
+    if gd.preview_state \
+    and gd.preview_type not in {self.map_name, 'none'}:
+        self.switch_preview(bpy.context, gd.preview_type)
+
+
 class GRABDOC_OT_map_preview(OpInfo, Operator):
     """Preview the selected material"""
     bl_idname = "grab_doc.preview_map"
@@ -406,46 +933,104 @@ class GRABDOC_OT_map_preview(OpInfo, Operator):
 
     map_name: StringProperty()
 
+    @classmethod
+    def poll(cls, context: Context) -> bool:
+        return not GRABDOC_OT_export_maps.is_running or poll_message_error(
+            cls, Error.EXPORT_RUNNING, print_err_line=False
+        )
+
+    # NOTE: Events that can never end or change the preview
+    IGNORED_EVENTS = {
+        'MOUSEMOVE',
+        'INBETWEEN_MOUSEMOVE',
+        'TIMER',
+        'TIMER_REPORT',
+        'TIMERREGION',
+        'NONE'
+    }
+    SETTINGS_PROPERTIES = ("format", "depth", "exr_depth", "coll_rendered")
+
     def modal(self, context: Context, event: Event):
+        if event.type in self.IGNORED_EVENTS:
+            return {'PASS_THROUGH'}
+
+        # Exit check
+        if not context.scene.gd.preview_state \
+        or event.type in {'ESC'} \
+        or not proper_scene_setup():
+            self.modal_cleanup(context)
+            return {'CANCELLED'}
+        return {'PASS_THROUGH'}
+
+    def apply_preview_settings(self, context: Context) -> None:
+        """Apply the camera & exporter settings, only writing changed
+        values so rendered viewports don't restart sampling"""
         scene = context.scene
         gd = scene.gd
 
-        scene.camera = bpy.data.objects[Global.TRIM_CAMERA_NAME]
+        trim_camera = bpy.data.objects.get(Global.TRIM_CAMERA_NAME)
+        if trim_camera is not None:
+            set_if_changed(scene, "camera", trim_camera)
 
         # Exporter settings
         # NOTE: Use alpha channel if background plane not visible in render
         image_settings = scene.render.image_settings
-        if not gd.coll_rendered:
-            scene.render.film_transparent = True
-            image_settings.color_mode = 'RGBA'
-        else:
-            scene.render.film_transparent = False
-            image_settings.color_mode = 'RGB'
+        set_if_changed(scene.render, "film_transparent", not gd.coll_rendered)
+        set_if_changed(
+            image_settings, "color_mode",
+            'RGB' if gd.coll_rendered else 'RGBA'
+        )
 
         # Get correct file format and color depth
-        image_settings.file_format = gd.format
+        set_if_changed(image_settings, "file_format", gd.format)
         if gd.format == 'OPEN_EXR':
-            image_settings.color_depth = gd.exr_depth
+            set_if_changed(image_settings, "color_depth", gd.exr_depth)
         elif gd.format != 'TARGA':
-            image_settings.color_depth = gd.depth
+            set_if_changed(image_settings, "color_depth", gd.depth)
 
-        # Exit check
-        if not gd.preview_state \
-        or event.type in {'ESC'} \
-        or not proper_scene_setup():
-            self.modal_cleanup(context)
-            return {'CANCELLED'}
-        return {'PASS_THROUGH'}
+    def msgbus_subscribe(self, context: Context) -> None:
+        """Re-apply settings only when the properties they derive from
+        change, rather than polling them on every modal event"""
+        scene = context.scene
+        self.msgbus_owner = object()
+        keys = [
+            scene.gd.path_resolve(name, False)
+            for name in self.SETTINGS_PROPERTIES
+        ]
+        keys.append(scene.path_resolve("camera", False))
+        for key in keys:
+            bpy.msgbus.subscribe_rna(
+                key=key,
+                owner=self.msgbus_owner,
+                args=(self,),
+                notify=preview_settings_notify
+            )
+        bpy.msgbus.subscribe_rna(
+            key=scene.gd.path_resolve("preview_type", False),
+            owner=self.msgbus_owner,
+            args=(self,),
+            notify=preview_type_notify
+        )
+
+    def switch_preview(self, context: Context, map_name: str) -> None:
+        gd = context.scene.gd
+        self.map_name = map_name
+        self.baker = getattr(gd, map_name)[0]
+        result = self.session.set_map(
+            self.baker, get_rendered_objects(), self.use_switch
+        )
+        if result is False:
+            self.report({'INFO'}, Error.MAT_SLOTS_WITHOUT_LINKS)
 
     def modal_cleanup(self, context: Context) -> None:
         gd = context.scene.gd
         gd.preview_state = False
 
+        bpy.msgbus.clear_by_owner(self.msgbus_owner)
         SpaceView3D.draw_handler_remove(self._handle, 'WINDOW')
 
-        self.baker.cleanup()
-        node_cleanup(self.baker.NODE)
-        baker_cleanup(self, context)
+        self.session.release_map()
+        release_session(context, self.session)
 
         # Current workspace shading type
         for area in context.screen.areas:
@@ -473,6 +1058,7 @@ class GRABDOC_OT_map_preview(OpInfo, Operator):
             bpy.ops.grab_doc.view_cam(from_modal=True)
 
     def execute(self, context: Context):
+        flush_pending_scene_update()
         report_value, report_string = \
             bad_setup_check(context, active_export=False)
         if report_value:
@@ -498,15 +1084,17 @@ class GRABDOC_OT_map_preview(OpInfo, Operator):
         if not is_camera_in_3d_view():
             bpy.ops.view3d.view_camera()
 
-        baker_init(self, context)
+        self.session = begin_session(context)
 
         self.baker = getattr(gd, self.map_name)[0]
-        self.baker.setup()
-        if self.baker.NODE:
-            rendered_objects = get_rendered_objects()
-            result = apply_node_to_objects(self.baker.NODE, rendered_objects)
-            if result is False:
-                self.report({'INFO'}, Error.MAT_SLOTS_WITHOUT_LINKS)
+        self.use_switch = gd.use_map_switch
+        result = self.session.set_map(
+            self.baker, get_rendered_objects(), self.use_switch
+        )
+        if result is False:
+            self.report({'INFO'}, Error.MAT_SLOTS_WITHOUT_LINKS)
+        self.apply_preview_settings(context)
+        self.msgbus_subscribe(context)
         self._handle = SpaceView3D.draw_handler_add(
             draw_callback_px, (self, context), 'WINDOW', 'POST_PIXEL'
         )
@@ -633,7 +1221,7 @@ def get_channel_path(channel: str) -> str | None:
     fmt = get_format()
     filename = ""
     if channel == 'normals':
-        filename = gd.export_name + '_' + gd.occlusion[0].suffix + fmt
+        filename = gd.export_name + '_' + gd.normals[0].suffix + fmt
     elif channel == 'curvature':
         filename = gd.export_name + '_' + gd.curvature[0].suffix + fmt
     elif channel == 'occlusion':
@@ -654,12 +1242,38 @@ def get_channel_path(channel: str) -> str | None:
         filename = gd.export_name + '_' + gd.metallic[0].suffix + fmt
     if filename == "":
         return None
-    filepath = os.path.join(gd.export_path, filename)
+    filepath = os.path.join(bpy.path.abspath(gd.export_path), filename)
     if not os.path.exists(filepath):
         return None
     return filepath
 
 
+def get_pack_layouts(
+        context: Context
+    ) -> list[tuple[str, list[tuple[str, int]]]]:
+    """Get the name & (bake map ID, channel) items of the main
+    packing channels followed by each additional pack layout"""
+    gd = context.scene.gd
+    layouts = []
+    for layout in (gd, *gd.pack_layouts):
+        channels = [
+            (layout.channel_r, 0), (layout.channel_g, 1), (layout.channel_b, 2)
+        ]
+        if layout.channel_a != 'none':
+            channels.append((layout.channel_a, 3))
+        layouts.append((layout.pack_name, channels))
+    return layouts
+
+
+def get_pack_map_ids(context: Context) -> set[str]:
+    """Get the bake map IDs used by any pack layout"""
+    return {
+        map_id
+        for _pack_name, channels in get_pack_layouts(context)
+        for map_id, _channel in channels
+    }
+
+
 def is_pack_maps_enabled() -> bool:
     """Checks if the chosen pack channels
     match the enabled maps to export.
@@ -671,19 +1285,9 @@ def is_pack_maps_enabled() -> bool:
     for bake_map in bake_maps:
         bake_map_names.append(bake_map.ID)
 
-    gd = bpy.context.scene.gd
-    if gd.channel_r not in bake_map_names \
-    and get_channel_path(gd.channel_r) is None:
-        return False
-    if gd.channel_g not in bake_map_names \
-    and get_channel_path(gd.channel_g) is None:
-        return False
-    if gd.channel_b not in bake_map_names \
-    and get_channel_path(gd.channel_b) is None:
-        return False
-    if gd.channel_a not in bake_map_names \
-    and get_channel_path(gd.channel_a) is None:
-        return False
+    for map_id in get_pack_map_ids(bpy.context):
+        if map_id not in bake_map_names and get_channel_path(map_id) is None:
+            return False
     return True
 
 
@@ -694,64 +1298,99 @@ class GRABDOC_OT_pack_maps(OpInfo, Operator):
 
     @classmethod
     def poll(cls, context: Context) -> bool:
-        gd = context.scene.gd
-        r = get_channel_path(gd.channel_r)
-        g = get_channel_path(gd.channel_g)
-        b = get_channel_path(gd.channel_b)
-        a = get_channel_path(gd.channel_a)
-        if not all((r, g, b)):
-            return False
-        if gd.channel_a != 'none' and a is None:
-            return False
-        return True
+        return all(
+            get_channel_path(map_id) is not None
+            for map_id in get_pack_map_ids(context)
+        )
 
     def execute(self, context):
         gd = context.scene.gd
-
-        pack_name = gd.export_name + "_" + gd.pack_name
-        path = gd.export_path
+        path = bpy.path.abspath(gd.export_path)
+        layouts = [
+            (
+                os.path.join(
+                    path, f"{gd.export_name}_{pack_name}{get_format()}"
+                ),
+                channels
+            )
+            for pack_name, channels in get_pack_layouts(context)
+        ]
+        map_ids = get_pack_map_ids(context)
+
+        # Stream channels file to file without image datablocks
+        if is_streaming_pack_supported():
+            sources = {
+                map_id: bpy.path.abspath(get_channel_path(map_id))
+                for map_id in map_ids
+            }
+            try:
+                pack_channels_streaming(
+                    sources,
+                    layouts,
+                    png_compression=get_png_compression(context)
+                )
+            except (OSError, ValueError) as error:
+                self.report({'ERROR'}, f"Map packing failed: {error}")
+                return {'CANCELLED'}
+            self.remove_original_maps(context)
+            return {'FINISHED'}
 
         # Loads all images into blender to avoid using a
         # separate python module to convert to np array
-        image_r = bpy.data.images.load(get_channel_path(gd.channel_r))
-        image_g = bpy.data.images.load(get_channel_path(gd.channel_g))
-        image_b = bpy.data.images.load(get_channel_path(gd.channel_b))
-        pack_order = [
-            (image_r, (0, 0)),
-            (image_g, (0, 1)),
-            (image_b, (0, 2))
-        ]
-        if gd.channel_a != 'none':
-            image_a = bpy.data.images.load(get_channel_path(gd.channel_a))
-            pack_order.append((image_a, (0, 3)))
-
-        dst_image = pack_image_channels(pack_order, pack_name)
-        dst_image.filepath_raw = path+"//"+pack_name+get_format()
-        dst_image.file_format = gd.format
-        dst_image.save()
+        # NOTE: Each source is loaded once & shared by all layouts
+        images = {
+            map_id: bpy.data.images.load(get_channel_path(map_id))
+            for map_id in map_ids
+        }
+        for pack_path, channels in layouts:
+            pack_order = [
+                (images[map_id], (0, channel)) for map_id, channel in channels
+            ]
+            pack_name = os.path.splitext(os.path.basename(pack_path))[0]
+            dst_image = pack_image_channels(pack_order, pack_name)
+            dst_image.filepath_raw = pack_path
+            dst_image.file_format = gd.format
+            dst_image.save()
+            bpy.data.images.remove(dst_image)
 
         # Remove images from blend file to keep it clean
-        bpy.data.images.remove(image_r)
-        bpy.data.images.remove(image_g)
-        bpy.data.images.remove(image_b)
-        if gd.channel_a != 'none':
-            bpy.data.images.remove(image_a)
-        bpy.data.images.remove(dst_image)
-
-        # Option to delete the extra maps through the operator panel
-        if gd.remove_original_maps is True:
-            if os.path.exists(get_channel_path(gd.channel_r)):
-                os.remove(get_channel_path(gd.channel_r))
-
-            if os.path.exists(get_channel_path(gd.channel_g)):
-                os.remove(get_channel_path(gd.channel_g))
-
-            if os.path.exists(get_channel_path(gd.channel_b)):
-                os.remove(get_channel_path(gd.channel_b))
-                
-            if gd.channel_a != 'none':
-                if os.path.exists(get_channel_path(gd.channel_a)):
-                    os.remove(get_channel_path(gd.channel_a))
+        for image in images.values():
+            bpy.data.images.remove(image)
+
+        self.remove_original_maps(context)
+        return {'FINISHED'}
+
+    @staticmethod
+    def remove_original_maps(context: Context) -> None:
+        """Option to delete the extra maps through the operator panel"""
+        gd = context.scene.gd
+        if gd.remove_original_maps is not True:
+            return
+        for map_id in get_pack_map_ids(context):
+            path = get_channel_path(map_id)
+            if path is not None:
+                os.remove(path)
+
+
+class GRABDOC_OT_add_pack_layout(OpInfo, Operator):
+    """Add a packed map produced alongside the main packing channels"""
+    bl_idname = "grab_doc.add_pack_layout"
+    bl_label = "Add Pack Layout"
+
+    def execute(self, context: Context):
+        context.scene.gd.pack_layouts.add()
+        return {'FINISHED'}
+
+
+class GRABDOC_OT_remove_pack_layout(OpInfo, Operator):
+    """Remove this pack layout"""
+    bl_idname = "grab_doc.remove_pack_layout"
+    bl_label = "Remove Pack Layout"
+
+    index: IntProperty(options={'HIDDEN'})
+
+    def execute(self, context: Context):
+        context.scene.gd.pack_layouts.remove(self.index)
         return {'FINISHED'}
 
 
@@ -768,12 +1407,15 @@ classes = (
     GRABDOC_OT_remove_setup,
     GRABDOC_OT_single_render,
     GRABDOC_OT_export_maps,
+    GRABDOC_OT_export_maps_parallel,
     GRABDOC_OT_map_preview_warning,
     GRABDOC_OT_map_preview,
     GRABDOC_OT_leave_map_preview,
     GRABDOC_OT_export_current_preview,
     GRABDOC_OT_config_maps,
-    GRABDOC_OT_pack_maps
+    GRABDOC_OT_pack_maps,
+    GRABDOC_OT_add_pack_layout,
+    GRABDOC_OT_remove_pack_layout
 )
 
 def register():
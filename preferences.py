@@ -27,7 +27,14 @@ from bpy.props import (
 )
 
 from .constants import Global
-from .utils.scene import scene_setup
+from .operators.operators import GRABDOC_OT_export_maps
+from .utils.generic import suspend_updates, suspendable
+from .utils.node import refresh_node_groups
+from .utils.scene import (
+    scene_update,
+    scene_update_debounced,
+    get_camera_height
+)
 #from .utils.render import get_rendered_objects, set_guide_height
 from .utils.baker import (
     Alpha,
@@ -51,17 +58,58 @@ from .utils.baker import (
 class GRABDOC_MT_presets(Menu):
     bl_label = ""
     preset_subdir = "gd"
-    preset_operator = "script.execute_preset"
+    preset_operator = "grab_doc.load_preset"
     draw = Menu.draw_preset
 
 
 class GRABDOC_PT_presets(PresetPanel, Panel):
     bl_label = 'GrabDoc Presets'
     preset_subdir = 'grab_doc'
-    preset_operator = 'script.execute_preset'
+    preset_operator = 'grab_doc.load_preset'
     preset_add_operator = 'grab_doc.preset_add'
 
 
+class GRABDOC_OT_load_preset(Operator):
+    """Apply a preset with property updates suspended,
+then update the scene & bake maps once"""
+    bl_idname = "grab_doc.load_preset"
+    bl_label = "Load Preset"
+    bl_options = {'REGISTER', 'UNDO', 'INTERNAL'}
+
+    filepath: StringProperty(subtype='FILE_PATH', options={'SKIP_SAVE'})
+    menu_idname: StringProperty(options={'SKIP_SAVE'})
+
+    @classmethod
+    def poll(cls, _context: Context) -> bool:
+        return not GRABDOC_OT_export_maps.is_running
+
+    def execute(self, context: Context):
+        if not os.path.exists(self.filepath):
+            self.report({'ERROR'}, f"Preset not found: {self.filepath}")
+            return {'CANCELLED'}
+
+        # NOTE: Matches the preset menu label of script.execute_preset
+        preset_class = getattr(bpy.types, self.menu_idname, None)
+        if preset_class is not None:
+            preset_class.bl_label = bpy.path.display_name(
+                os.path.basename(self.filepath), title_case=False
+            )
+
+        with suspend_updates():
+            bpy.utils.execfile(self.filepath)
+        apply_preset_updates(context)
+        return {'FINISHED'}
+
+
+def apply_preset_updates(context: Context) -> None:
+    """Run the work of every suspended update callback once"""
+    gd = context.scene.gd
+    scene_update(None, context)
+    refresh_node_groups(context)
+    if gd.preview_state and gd.preview_type != 'none':
+        getattr(gd, gd.preview_type)[0].apply_render_settings()
+
+
 class GRABDOC_OT_add_preset(AddPresetBase, Operator):
     bl_idname = "grab_doc.preset_add"
     bl_label = "Add a new preset"
@@ -98,6 +146,15 @@ class GRABDOC_OT_add_preset(AddPresetBase, Operator):
 
         "gd.use_bake_collections",
         "gd.export_plane",
+        "gd.use_aov_export",
+        "gd.use_export_cache",
+        "gd.use_export_trace",
+        "gd.use_map_switch",
+        "gd.use_parallel_export",
+        "gd.export_workers",
+        "gd.worker_threads",
+        "gd.use_tiled_export",
+        "gd.tile_size",
 
         "gd.marmo_auto_bake",
         "gd.marmo_auto_close",
@@ -121,7 +178,8 @@ class GRABDOC_OT_add_preset(AddPresetBase, Operator):
         "gd.channel_r",
         "gd.channel_g",
         "gd.channel_b",
-        "gd.channel_a"
+        "gd.channel_a",
+        "gd.pack_layouts"
     ]
 
     # Where to store the preset
@@ -133,6 +191,21 @@ class GRABDOC_OT_add_preset(AddPresetBase, Operator):
 ############################################################
 
 
+MAP_TYPES = (
+    ('none',      "None",              ""),
+    ('normals',   "Normals",           ""),
+    ('curvature', "Curvature",         ""),
+    ('occlusion', "Ambient Occlusion", ""),
+    ('height',    "Height",            ""),
+    ('id',        "Material ID",       ""),
+    ('alpha',     "Alpha",             ""),
+    ('color',     "Base Color",        ""),
+    ('emissive',  "Emissive",          ""),
+    ('roughness', "Roughness",         ""),
+    ('metallic',  "Metallic",          "")
+)
+
+
 class GRABDOC_AP_preferences(AddonPreferences):
     bl_idname = __package__
 
@@ -144,20 +217,17 @@ class GRABDOC_AP_preferences(AddonPreferences):
     )
 
 
+class GRABDOC_pack_layout(PropertyGroup):
+    """Additional packed map produced from the same bake maps"""
+    pack_name: StringProperty(name="Packed Map Name", default="Packed")
+    channel_r: EnumProperty(items=MAP_TYPES[1:], default="occlusion", name='R')
+    channel_g: EnumProperty(items=MAP_TYPES[1:], default="roughness", name='G')
+    channel_b: EnumProperty(items=MAP_TYPES[1:], default="metallic", name='B')
+    channel_a: EnumProperty(items=MAP_TYPES, default="none", name='A')
+
+
 class GRABDOC_property_group(PropertyGroup):
-    MAP_TYPES = (
-        ('none',      "None",              ""),
-        ('normals',   "Normals",           ""),
-        ('curvature', "Curvature",         ""),
-        ('occlusion', "Ambient Occlusion", ""),
-        ('height',    "Height",            ""),
-        ('id',        "Material ID",       ""),
-        ('alpha',     "Alpha",             ""),
-        ('color',     "Base Color",        ""),
-        ('emissive',  "Emissive",          ""),
-        ('roughness', "Roughness",         ""),
-        ('metallic',  "Metallic",          "")
-    )
+    MAP_TYPES = MAP_TYPES
 
     def update_export_name(self, _context: Context):
         if not self.export_name:
@@ -169,22 +239,23 @@ class GRABDOC_property_group(PropertyGroup):
         if self.export_path != '' and not export_path_exists:
             self.export_path = ''
 
+    @suspendable
     def update_res_x(self, context: Context):
         if self.lock_res and self.resolution_x != self.resolution_y:
             self.resolution_y = self.resolution_x
-        scene_setup(self, context)
+        scene_update_debounced(self, context)
 
+    @suspendable
     def update_res_y(self, context: Context):
         if self.lock_res and self.resolution_y != self.resolution_x:
             self.resolution_x = self.resolution_y
-        scene_setup(self, context)
+        scene_update_debounced(self, context)
 
+    @suspendable
     def update_scale(self, context: Context):
-        scene_setup(self, context)
+        scene_update_debounced(self, context)
 
-        gd_camera_ob_z = bpy.data.objects.get(
-            Global.TRIM_CAMERA_NAME
-        ).location[2]
+        gd_camera_ob_z = get_camera_height(self)
         height_ng = bpy.data.node_groups.get(Global.HEIGHT_NODE)
 
         map_range = height_ng.nodes.get('Map Range')
@@ -197,16 +268,24 @@ class GRABDOC_property_group(PropertyGroup):
         map_range_alpha.inputs[1].default_value = gd_camera_ob_z - .00001
         map_range_alpha.inputs[2].default_value = gd_camera_ob_z
 
+    @suspendable
+    def update_filter_width(self, context: Context):
+        # NOTE: Otherwise applied by `baker_init` once a session starts
+        if not self.preview_state:
+            return
+        context.scene.render.filter_size = \
+        context.scene.cycles.filter_width = self.filter_width
+
     # Project Setup
     coll_selectable: BoolProperty(
-        update=scene_setup,
+        update=scene_update,
         description="Sets the background plane selection capability"
     )
-    coll_visible: BoolProperty(default=True, update=scene_setup,
+    coll_visible: BoolProperty(default=True, update=scene_update,
                               description="Sets the visibility in the viewport")
     coll_rendered: BoolProperty(
         default=True,
-        update=scene_setup,
+        update=scene_update,
         description=\
             "Sets the visibility in exports, this will also enable transparency and alpha channel exports if visibility is turned off"
     )
@@ -227,7 +306,7 @@ class GRABDOC_property_group(PropertyGroup):
         default=True,
         description=\
             "Pixel filtering, useful for avoiding aliased edges on bake maps",
-        update=scene_setup
+        update=scene_update
     )
     filter_width: FloatProperty(
         name="Filter Amount",
@@ -236,21 +315,21 @@ class GRABDOC_property_group(PropertyGroup):
         soft_max=10,
         subtype='PIXEL',
         description="The width in pixels used for filtering",
-        update=scene_setup
+        update=update_filter_width
     )
 
     reference: PointerProperty(
         name='Reference Selection',
         type=Image,
         description="Select an image reference to use on the background plane",
-        update=scene_setup
+        update=scene_update
     )
     use_grid: BoolProperty(
         name='Use Grid',
         default=True,
         description=\
             "Wireframe grid on plane for better snapping usability",
-        update=scene_setup
+        update=scene_update
     )
     grid_subdivs: IntProperty(
         name="Grid Subdivisions",
@@ -258,7 +337,7 @@ class GRABDOC_property_group(PropertyGroup):
         min=0,
         soft_max=64,
         description="Subdivision count for grid",
-        update=scene_setup
+        update=scene_update_debounced
     )
 
     # Baker
@@ -301,11 +380,70 @@ class GRABDOC_property_group(PropertyGroup):
     )
     use_bake_collections: BoolProperty(
         description="Add a collection to the scene for use as bake groups",
-        update=scene_setup
+        update=scene_update
     )
     export_plane: BoolProperty(
         description="Export the background plane as an unwrapped FBX"
     )
+    use_aov_export: BoolProperty(
+        name="Single Render",
+        description=\
+            "Render all shader based maps (color, emissive, roughness, metallic, normals, height, alpha & occlusion) in a single Cycles render using AOVs",
+        default=False
+    )
+    use_export_cache: BoolProperty(
+        name="Export Cache",
+        description=\
+            "Skip rendering maps whose objects, materials and settings are unchanged since the last export",
+        default=False
+    )
+    use_export_trace: BoolProperty(
+        name="Export Trace",
+        description=\
+            "Time every export stage and write a Chrome/Perfetto trace JSON next to the exported maps",
+        default=False
+    )
+    use_map_switch: BoolProperty(
+        name="Map Switch",
+        description=\
+            "Wire a single switch node group into every material once per export or preview, changing maps by index instead of rewiring materials",
+        default=False
+    )
+    use_parallel_export: BoolProperty(
+        name="Parallel Export",
+        description=\
+            "Export maps in background Blender processes, keeping the UI usable while exporting",
+        default=False
+    )
+    export_workers: IntProperty(
+        name="Workers",
+        default=4,
+        min=1,
+        soft_max=16,
+        description="Amount of background Blender processes used for exporting"
+    )
+    use_tiled_export: BoolProperty(
+        name="Tiled Export",
+        description=\
+            "Render large maps in tiles streamed to disk, bounding memory usage by the tile size instead of the resolution",
+        default=False
+    )
+    tile_size: IntProperty(
+        name="Tile Size",
+        default=2048,
+        min=256,
+        soft_max=8192,
+        subtype='PIXEL',
+        description="Width and height of each rendered tile"
+    )
+    worker_threads: IntProperty(
+        name="Threads",
+        default=0,
+        min=0,
+        soft_max=64,
+        description=\
+            "Render threads per worker, 0 splits all CPU cores evenly between workers"
+    )
 
     # Image Formats
     format: EnumProperty(
@@ -411,6 +549,7 @@ class GRABDOC_property_group(PropertyGroup):
     channel_g: EnumProperty(items=MAP_TYPES[1:], default="roughness", name='G')
     channel_b: EnumProperty(items=MAP_TYPES[1:], default="metallic", name='B')
     channel_a: EnumProperty(items=MAP_TYPES, default="none", name='A')
+    pack_layouts: CollectionProperty(type=GRABDOC_pack_layout)
 
 
 ##################################
@@ -422,6 +561,7 @@ classes = (
     GRABDOC_MT_presets,
     GRABDOC_PT_presets,
     GRABDOC_OT_add_preset,
+    GRABDOC_OT_load_preset,
     Normals,
     Curvature,
     Occlusion,
@@ -432,6 +572,7 @@ classes = (
     Emissive,
     Roughness,
     Metallic,
+    GRABDOC_pack_layout,
     GRABDOC_property_group,
     GRABDOC_AP_preferences
 )
@@ -5,6 +5,7 @@ from bpy.types import Context, Panel, UILayout
 
 from .constants import Global
 from .preferences import GRABDOC_PT_presets
+from .utils import trace
 from .utils.generic import (
     PanelInfo,
     proper_scene_setup,
@@ -111,10 +112,11 @@ class GRABDOC_PT_export(PanelInfo, Panel):
         if gd.baker_type == 'marmoset' \
         and not os.path.exists(marmo_executable):
             layout.enabled = False
-        layout.operator(
-            "grab_doc.export_maps",
-            text="Export", icon="EXPORT"
-        )
+        if gd.baker_type == 'blender' and gd.use_parallel_export:
+            operator = "grab_doc.export_maps_parallel"
+        else:
+            operator = "grab_doc.export_maps"
+        layout.operator(operator, text="Export", icon="EXPORT")
 
     def marmo_header_layout(self, layout: UILayout):
         preferences = bpy.context.preferences.addons[__package__].preferences
@@ -219,6 +221,19 @@ class GRABDOC_PT_export(PanelInfo, Panel):
             gd, "export_plane",
             text='Export Plane'
         )
+        if gd.baker_type == "blender":
+            col.prop(gd, "use_aov_export", text="Single Render (AOV)")
+            col.prop(gd, "use_export_cache", text="Export Cache")
+            col.prop(gd, "use_export_trace", text="Export Trace")
+            col.prop(gd, "use_map_switch", text="Map Switch")
+            col.prop(gd, "use_parallel_export", text="Parallel Export")
+            if gd.use_parallel_export:
+                row = col.row(align=True)
+                row.prop(gd, "export_workers")
+                row.prop(gd, "worker_threads")
+            col.prop(gd, "use_tiled_export", text="Tiled Export")
+            if gd.use_tiled_export:
+                col.prop(gd, "tile_size")
         col.prop(gd, 'use_pack_maps')
         if gd.use_pack_maps:
             col.prop(gd, 'remove_original_maps')
@@ -235,6 +250,31 @@ class GRABDOC_PT_export(PanelInfo, Panel):
             )
 
 
+class GRABDOC_PT_export_trace(PanelInfo, Panel):
+    bl_label = 'Export Trace'
+    bl_parent_id = "GRABDOC_PT_export"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    @classmethod
+    def poll(cls, context: Context) -> bool:
+        return context.scene.gd.use_export_trace and bool(trace.last_summary)
+
+    def draw(self, _context: Context):
+        layout = self.layout
+        col = layout.column(align=True)
+        row = col.row()
+        row.label(text="Stage")
+        row.label(text="Calls")
+        row.label(text="Time")
+        row.label(text="Peak RSS")
+        for name, count, total, rss in trace.last_summary:
+            row = col.row()
+            row.label(text=name)
+            row.label(text=str(count))
+            row.label(text=f"{total:.2f}s")
+            row.label(text=f"{rss:.0f} MB")
+
+
 class GRABDOC_PT_view_edit_maps(PanelInfo, Panel):
     bl_label = 'Edit Maps'
     bl_parent_id = "GRABDOC_PT_grabdoc"
@@ -264,6 +304,11 @@ class GRABDOC_PT_view_edit_maps(PanelInfo, Panel):
         row.scale_y = 1.5
         row.operator("grab_doc.leave_modal", icon="CANCEL")
 
+        if gd.use_map_switch:
+            col.prop(gd, "preview_type", text="")
+            if gd.preview_type == 'none':
+                return
+
         row = col.row(align=True)
         row.scale_y = 1.1
         baker = getattr(gd, gd.preview_type)[0]
@@ -300,6 +345,20 @@ class GRABDOC_PT_pack_maps(PanelInfo, Panel):
         col.prop(gd, 'channel_a')
         col.prop(gd, 'pack_name', text="Suffix")
 
+        for idx, pack_layout in enumerate(gd.pack_layouts):
+            box = layout.box()
+            row = box.row(align=True)
+            row.prop(pack_layout, 'pack_name', text="Suffix")
+            row.operator(
+                "grab_doc.remove_pack_layout", text="", icon='X'
+            ).index = idx
+            col = box.column(align=True)
+            col.prop(pack_layout, 'channel_r')
+            col.prop(pack_layout, 'channel_g')
+            col.prop(pack_layout, 'channel_b')
+            col.prop(pack_layout, 'channel_a')
+        layout.operator("grab_doc.add_pack_layout", icon='ADD')
+
 
 ################################################
 # BAKER UI
@@ -387,6 +446,7 @@ class GRABDOC_PT_alpha(BakerPanel, PanelInfo, Panel):
 classes = (
     GRABDOC_PT_grabdoc,
     GRABDOC_PT_export,
+    GRABDOC_PT_export_trace,
     GRABDOC_PT_view_edit_maps,
     GRABDOC_PT_pack_maps,
     GRABDOC_PT_color,
@@ -0,0 +1,271 @@
+import os
+
+import bpy
+from bpy.types import Context, Object
+
+from ..constants import Global
+from .generic import (
+    get_format,
+    mute_compositor_nodes,
+    restore_compositor_nodes
+)
+from .node import (
+    node_init,
+    get_material_index,
+    get_indexed_materials,
+    link_bsdf_inputs
+)
+from .baker import Baker, set_color_management
+
+
+AOV_PREFIX = Global.PREFIX + "AOV "
+
+
+def get_aov_name(bake_map: Baker) -> str:
+    return Global.PREFIX + bake_map.ID
+
+
+def get_aov_bake_maps(bake_maps: list[Baker]) -> list[Baker]:
+    """Filter the given bake maps down to the ones
+    that can be split out of a single render via AOVs"""
+    return [
+        bake_map for bake_map in bake_maps
+        if bake_map.ID in Global.AOV_MAP_IDS and bake_map.NODE
+    ]
+
+
+def refresh_aov_node_groups(context: Context, bake_maps: list[Baker]) -> None:
+    """Rebuild node groups created before the AOV output socket existed"""
+    outdated = False
+    for bake_map in bake_maps:
+        tree = bpy.data.node_groups.get(bake_map.NODE)
+        if tree is None:
+            outdated = True
+            continue
+        if Global.AOV_SOCKET_NAME in tree.interface.items_tree:
+            continue
+        bpy.data.node_groups.remove(tree)
+        outdated = True
+    if not outdated:
+        return
+    node_init()
+
+    # NOTE: Property driven node values aren't set by `node_init`
+    for bake_map in bake_maps:
+        bake_map.refresh(context)
+
+
+def aov_init(
+        self,
+        context: Context,
+        bake_maps: list[Baker],
+        objects: set[Object]
+    ) -> None:
+    """Add AOV outputs for every given bake map to all rendered
+    materials and route them to files through the compositor"""
+    scene = context.scene
+    gd = scene.gd
+    view_layer = context.view_layer
+
+    refresh_aov_node_groups(context, bake_maps)
+
+    # View layer AOVs
+    self.addedAovs = []
+    for bake_map in bake_maps:
+        aov_name = get_aov_name(bake_map)
+        if aov_name in view_layer.aovs:
+            continue
+        aov = view_layer.aovs.add()
+        aov.name = aov_name
+        aov.type = 'COLOR'
+        self.addedAovs.append(aov_name)
+
+    # Materials
+    self.createdGdMaterial = \
+        Global.GD_MATERIAL_NAME not in bpy.data.materials
+    materials = get_indexed_materials(get_material_index(objects))
+
+    self.aovMaterials = []
+    self.savedBlendMethods = {}
+    self.savedMaterialUseNodes = {}
+    for material in materials:
+        self.savedMaterialUseNodes[material.name] = material.use_nodes
+        material.use_nodes = True
+        nodes = material.node_tree.nodes
+        links = material.node_tree.links
+
+        output_nodes = [
+            node for node in nodes if node.type == 'OUTPUT_MATERIAL'
+        ]
+        output = None
+        for node in output_nodes:
+            if node.is_active_output:
+                output = node
+                break
+        else:
+            if output_nodes:
+                output = output_nodes[0]
+        source_node = None
+        if output is not None and output.inputs['Surface'].links:
+            source_node = output.inputs['Surface'].links[0].from_node
+        location = output.location if output is not None else (0, 0)
+
+        self.aovMaterials.append(material.name)
+        self.savedBlendMethods[material.name] = material.blend_method
+        for idx, bake_map in enumerate(bake_maps):
+            group_node = nodes.new('ShaderNodeGroup')
+            group_node.node_tree = bpy.data.node_groups.get(bake_map.NODE)
+            group_node.name = AOV_PREFIX + bake_map.ID
+            group_node.hide = True
+            group_node.location = (location[0], location[1] - 160 - idx * 40)
+
+            if source_node is not None \
+            and bake_map.NODE in Global.SHADER_MAP_NAMES \
+            and "BSDF" in source_node.type:
+                link_bsdf_inputs(
+                    bake_map.NODE, group_node, source_node, material
+                )
+
+            aov_output = nodes.new('ShaderNodeOutputAOV')
+            aov_output.name = AOV_PREFIX + bake_map.ID + " Output"
+            aov_output.aov_name = get_aov_name(bake_map)
+            aov_output.hide = True
+            aov_output.location = (
+                location[0] + 200, location[1] - 160 - idx * 40
+            )
+            links.new(
+                aov_output.inputs['Color'],
+                group_node.outputs[Global.AOV_SOCKET_NAME]
+            )
+
+    # Compositor
+    self.savedUseNodes = scene.use_nodes
+    self.savedUseCompositing = scene.render.use_compositing
+    scene.use_nodes = True
+    tree = scene.node_tree
+    links = tree.links
+    self.savedCompositorMutes = mute_compositor_nodes(tree)
+
+    render_layers = tree.nodes.new('CompositorNodeRLayers')
+    render_layers.name = AOV_PREFIX + "Render Layers"
+    render_layers.scene = scene
+    render_layers.layer = view_layer.name
+    render_layers.location = (-600, 600)
+
+    file_output = tree.nodes.new('CompositorNodeOutputFile')
+    file_output.name = AOV_PREFIX + "File Output"
+    file_output.location = (200, 600)
+    file_output.base_path = bpy.path.abspath(gd.export_path)
+    copy_image_settings(scene.render.image_settings, file_output.format)
+    file_output.file_slots.clear()
+
+    use_alpha = scene.render.image_settings.color_mode == 'RGBA'
+    for idx, bake_map in enumerate(bake_maps):
+        file_output.file_slots.new(f"{gd.export_name}_{bake_map.suffix}")
+        source = render_layers.outputs[get_aov_name(bake_map)]
+        y_offset = 600 - idx * 60
+
+        # NOTE: Files are written with a Raw view transform,
+        # so display referred maps are converted by hand
+        if bake_map.VIEW_TRANSFORM == 'Standard' and gd.format != 'OPEN_EXR':
+            convert = tree.nodes.new('CompositorNodeConvertColorSpace')
+            convert.name = AOV_PREFIX + bake_map.ID + " Convert"
+            convert.location = (-300, y_offset)
+            try:
+                convert.from_color_space = 'Linear Rec.709'
+            except TypeError:
+                convert.from_color_space = 'Linear'
+            convert.to_color_space = 'sRGB'
+            links.new(convert.inputs['Image'], source)
+            source = convert.outputs['Image']
+        if use_alpha:
+            set_alpha = tree.nodes.new('CompositorNodeSetAlpha')
+            set_alpha.name = AOV_PREFIX + bake_map.ID + " Alpha"
+            set_alpha.location = (-100, y_offset)
+            links.new(set_alpha.inputs['Image'], source)
+            links.new(set_alpha.inputs['Alpha'], render_layers.outputs['Alpha'])
+            source = set_alpha.outputs['Image']
+        links.new(file_output.inputs[-1], source)
+
+    # NOTE: Rendering with compositing requires a composite
+    # node, the user's own ones are muted along with the rest
+    composite = tree.nodes.new('CompositorNodeComposite')
+    composite.name = AOV_PREFIX + "Composite"
+    composite.location = (200, 800)
+    links.new(composite.inputs['Image'], render_layers.outputs['Image'])
+
+
+def aov_render(self, context: Context, bake_maps: list[Baker]) -> list[str]:
+    """Render all AOV bake maps at once and move the
+    compositor outputs to their final export paths"""
+    scene = context.scene
+    gd = scene.gd
+    render = scene.render
+
+    render.engine = 'CYCLES'
+    scene.cycles.samples = max(bake_map.samples_cycles for bake_map in bake_maps)
+    set_color_management('sRGB', 'Raw')
+    render.use_compositing = True
+
+    scene.camera = bpy.data.objects[Global.TRIM_CAMERA_NAME]
+    bpy.ops.render.render(write_still=False)
+
+    # NOTE: The file output node always appends the frame number
+    export_path = bpy.path.abspath(gd.export_path)
+    paths = []
+    for bake_map in bake_maps:
+        name = f"{gd.export_name}_{bake_map.suffix}"
+        rendered_path = os.path.join(
+            export_path, f"{name}{scene.frame_current:04d}{get_format()}"
+        )
+        path = os.path.join(export_path, name + get_format())
+        if not os.path.exists(rendered_path):
+            continue
+        os.replace(rendered_path, path)
+        paths.append(path)
+    return paths
+
+
+def aov_cleanup(self, context: Context) -> None:
+    """Remove all AOV nodes, passes and compositor nodes"""
+    scene = context.scene
+    view_layer = context.view_layer
+
+    for name in self.aovMaterials:
+        material = bpy.data.materials.get(name)
+        if material is None:
+            continue
+        nodes = material.node_tree.nodes
+        for node in [node for node in nodes if node.name.startswith(AOV_PREFIX)]:
+            nodes.remove(node)
+        material.blend_method = self.savedBlendMethods[name]
+        material.use_nodes = self.savedMaterialUseNodes[name]
+
+    if self.createdGdMaterial \
+    and Global.GD_MATERIAL_NAME in bpy.data.materials:
+        bpy.data.materials.remove(bpy.data.materials[Global.GD_MATERIAL_NAME])
+
+    for aov_name in self.addedAovs:
+        aov = view_layer.aovs.get(aov_name)
+        if aov is not None:
+            view_layer.aovs.remove(aov)
+
+    tree = scene.node_tree
+    for node in [node for node in tree.nodes if node.name.startswith(AOV_PREFIX)]:
+        tree.nodes.remove(node)
+    restore_compositor_nodes(tree, self.savedCompositorMutes)
+    scene.use_nodes = self.savedUseNodes
+    scene.render.use_compositing = self.savedUseCompositing
+
+
+def copy_image_settings(source, target) -> None:
+    """Copy the relevant image format settings between two data-blocks"""
+    target.file_format = source.file_format
+    target.color_mode = source.color_mode
+    target.color_depth = source.color_depth
+    if source.file_format == 'PNG':
+        target.compression = source.compression
+    elif source.file_format == 'OPEN_EXR':
+        target.exr_codec = source.exr_codec
+    elif source.file_format == 'TIFF':
+        target.tiff_codec = source.tiff_codec
@@ -1,4 +1,5 @@
 import os
+from typing import Iterable
 
 import bpy
 from bpy.types import Context, PropertyGroup, UILayout
@@ -11,9 +12,9 @@ from bpy.props import (
 )
 
 from ..constants import Global
-from .generic import get_format
-from .render import set_guide_height, get_rendered_objects
-from .scene import scene_setup
+from .generic import get_format, suspendable
+from .render import set_guide_height
+from .scene import scene_update
 
 def BlenderVersionEevee ()-> str:
     #print (str(bpy.app.version))
@@ -48,6 +49,11 @@ class Baker():
         """Operations to run before bake map export."""
         self.apply_render_settings(requires_preview=False)
 
+    def refresh(self, context: Context) -> None:
+        """Re-apply the effects of every property update callback
+        at once, e.g. after they were suspended to load a preset"""
+
+    @suspendable
     def apply_render_settings(self, requires_preview: bool=True) -> None:
         if requires_preview and not bpy.context.scene.gd.preview_state:
             return
@@ -224,6 +230,11 @@ class Normals(Baker, PropertyGroup):
         if context.scene.gd.baker_type == 'blender':
             col.prop(self, 'use_texture', text="Texture Normals")
 
+    def refresh(self, context: Context) -> None:
+        self.update_flip_y(context)
+        self.update_use_texture(context)
+
+    @suspendable
     def update_flip_y(self, _context: Context):
         vec_multiply = \
             bpy.data.node_groups[self.NODE].nodes.get(
@@ -231,6 +242,7 @@ class Normals(Baker, PropertyGroup):
             )
         vec_multiply.inputs[1].default_value[1] = -.5 if self.flip_y else .5
 
+    @suspendable
     def update_use_texture(self, context: Context) -> None:
         if not context.scene.gd.preview_state:
             return
@@ -313,6 +325,7 @@ class Curvature(Baker, PropertyGroup):
         scene.display.matcap_ssao_distance = .075
         self.update_range(bpy.context)
 
+    @suspendable
     def apply_render_settings(self, requires_preview: bool=True):
         super().apply_render_settings(requires_preview)
         scene = bpy.context.scene
@@ -345,6 +358,11 @@ class Curvature(Baker, PropertyGroup):
 
         bpy.data.objects[Global.BG_PLANE_NAME].color[3] = 1
 
+    def refresh(self, context: Context) -> None:
+        self.update_curvature(context)
+        self.update_range(context)
+
+    @suspendable
     def update_curvature(self, context: Context):
         if not context.scene.gd.preview_state:
             return
@@ -354,6 +372,7 @@ class Curvature(Baker, PropertyGroup):
             scene_shading.curvature_ridge_factor = self.ridge
         scene_shading.curvature_valley_factor = self.valley
 
+    @suspendable
     def update_range(self, _context: Context):
         color_ramp = \
             bpy.data.node_groups[self.NODE].nodes.get("Color Ramp")
@@ -438,10 +457,16 @@ class Occlusion(Baker, PropertyGroup):
         col.prop(self, 'gamma', text="Intensity")
         col.prop(self, 'distance', text="Distance")
 
+    def refresh(self, context: Context) -> None:
+        self.update_gamma(context)
+        self.update_distance(context)
+
+    @suspendable
     def update_gamma(self, _context: Context):
         gamma = bpy.data.node_groups[self.NODE].nodes.get('Gamma')
         gamma.inputs[1].default_value = self.gamma
 
+    @suspendable
     def update_distance(self, _context: Context):
         ao = bpy.data.node_groups[self.NODE].nodes.get(
             'Ambient Occlusion'
@@ -490,8 +515,7 @@ class Height(Baker, PropertyGroup):
         super().setup()
 
         if self.method == 'AUTO':
-            rendered_obs = get_rendered_objects()
-            set_guide_height(rendered_obs)
+            set_guide_height()
 
     def draw_properties(self, context: Context, layout: UILayout):
         col = layout.column()
@@ -502,15 +526,26 @@ class Height(Baker, PropertyGroup):
         if self.method == 'MANUAL':
             col.prop(self, 'distance', text="0-1 Range")
 
+    @suspendable
     def update_method(self, context: Context):
-        scene_setup(self, context)
+        scene_update(self, context)
         if not context.scene.gd.preview_state:
             return
         if self.method == 'AUTO':
-            rendered_obs = get_rendered_objects()
-            set_guide_height(rendered_obs)
+            set_guide_height()
 
+    def refresh(self, context: Context) -> None:
+        self.update_guide_nodes()
+        if context.scene.gd.preview_state and self.method == 'AUTO':
+            set_guide_height()
+
+    @suspendable
     def update_guide(self, context: Context):
+        self.update_guide_nodes()
+        if self.method == 'MANUAL':
+            scene_update(self, context)
+
+    def update_guide_nodes(self) -> None:
         gd_camera_ob_z = \
             bpy.data.objects.get(Global.TRIM_CAMERA_NAME).location[2]
 
@@ -530,9 +565,6 @@ class Height(Baker, PropertyGroup):
         ramp.location = \
             (-400, 0)
 
-        if self.method == 'MANUAL':
-            scene_setup(self, context)
-
     invert: BoolProperty(
         description="Invert height mask, useful for sculpting negatively",
         update=update_guide
@@ -614,6 +646,11 @@ class Id(Baker, PropertyGroup):
         row.operator("grab_doc.quick_remove_selected_mats",
                         text='Selected')
 
+    def refresh(self, context: Context) -> None:
+        if context.scene.gd.preview_state:
+            self.update_method(context)
+
+    @suspendable
     def update_method(self, context: Context):
         shading = context.scene.display.shading
         shading.show_cavity = False
@@ -656,6 +693,10 @@ class Alpha(Baker, PropertyGroup):
             col.prop(self, 'invert_depth', text="Invert Depth")
             col.prop(self, 'invert_mask', text="Invert Mask")
 
+    def refresh(self, context: Context) -> None:
+        self.update_alpha(context)
+
+    @suspendable
     def update_alpha(self, _context: Context):
         gd_camera_ob_z = \
             bpy.data.objects.get(Global.TRIM_CAMERA_NAME).location[2]
@@ -737,6 +778,10 @@ class Roughness(Baker, PropertyGroup):
         if context.scene.gd.baker_type == 'blender':
             col.prop(self, 'invert', text="Invert")
 
+    def refresh(self, context: Context) -> None:
+        self.update_roughness(context)
+
+    @suspendable
     def update_roughness(self, _context: Context):
         invert = bpy.data.node_groups[self.NODE].nodes.get('Invert')
         invert.inputs[0].default_value = 1 if self.invert else 0
@@ -806,13 +851,18 @@ def get_bakers() -> list[Baker]:
     return bakers
 
 
-def get_bake_maps(enabled_only: bool = True) -> list[Baker]:
+def get_bake_maps(
+        enabled_only: bool = True,
+        map_ids: Iterable[str] | None = None
+    ) -> list[Baker]:
     bakers = get_bakers()
     bake_maps = []
     for baker in bakers:
         for bake_map in baker:
             if enabled_only and not (bake_map.enabled and bake_map.visibility):
                 continue
+            if map_ids is not None and bake_map.ID not in map_ids:
+                continue
             bake_maps.append(bake_map)
     return bake_maps
 
@@ -903,11 +953,13 @@ def baker_init(self, context: Context):
     render = scene.render
 
     # Active Camera
-    for area in context.screen.areas:
-        if area.type == 'VIEW_3D':
-            for space in area.spaces:
-                space.use_local_camera = False
-                break
+    # NOTE: No screen when running in the background
+    if context.screen is not None:
+        for area in context.screen.areas:
+            if area.type == 'VIEW_3D':
+                for space in area.spaces:
+                    space.use_local_camera = False
+                    break
     scene.camera = bpy.data.objects.get(Global.TRIM_CAMERA_NAME)
 
     # View layer
@@ -0,0 +1,208 @@
+"""Headless batch baking of many .blend files from a manifest.
+
+Usage:
+    blender -b --addons GrabDoc --python-expr "import importlib;
+    importlib.import_module('GrabDoc.utils.batch').main()" --
+    --manifest manifest.json --report report.json [--files-per-process 10]
+
+The manifest is a JSON list of jobs (or an object with a `jobs` list):
+    [
+        {
+            "file": "/path/to/trim_sheet.blend",
+            "scene": "Scene",                  # Optional, active scene
+            "maps": ["normals", "height"],     # Optional, enabled maps
+            "output": "/path/to/output/dir",
+            "name": "trim_sheet"               # Optional, export name
+        }
+    ]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import traceback
+import subprocess
+
+import bpy
+
+from ..constants import Global
+from .generic import bad_setup_check, get_format
+from .baker import get_bake_maps
+from .worker import get_blender_command
+
+
+def load_manifest(path: str) -> list[dict]:
+    with open(path, encoding='utf-8') as file:
+        manifest = json.load(file)
+    if isinstance(manifest, dict):
+        manifest = manifest["jobs"]
+    return manifest
+
+
+def write_report(path: str, results: list[dict], start: float) -> None:
+    report = {
+        "succeeded": len([r for r in results if r["status"] == 'FINISHED']),
+        "failed": len([r for r in results if r["status"] != 'FINISHED']),
+        "time": round(time.time() - start, 2),
+        "jobs": results
+    }
+    with open(path, "w", encoding='utf-8') as file:
+        json.dump(report, file, indent=4)
+
+
+def run_job(job: dict) -> dict:
+    """Open a .blend file and export its bake maps without UI"""
+    start = time.time()
+    result = {
+        "file": job["file"],
+        "scene": job.get("scene"),
+        "output": job["output"],
+        "status": 'CANCELLED',
+        "error": None,
+        "traceback": None,
+        "maps": []
+    }
+    try:
+        bpy.ops.wm.open_mainfile(filepath=job["file"], load_ui=False)
+        scene = bpy.context.scene
+        if job.get("scene"):
+            scene = bpy.data.scenes[job["scene"]]
+
+        with bpy.context.temp_override(
+            scene=scene, view_layer=scene.view_layers[0]
+        ):
+            context = bpy.context
+            gd = scene.gd
+
+            os.makedirs(job["output"], exist_ok=True)
+            gd.export_path = job["output"]
+            if job.get("name"):
+                gd.export_name = job["name"]
+            if job.get("maps") is not None:
+                for bake_map in get_bake_maps(enabled_only=False):
+                    bake_map.enabled = bake_map.ID in job["maps"]
+                    bake_map.visibility |= bake_map.enabled
+            # NOTE: Everything has to finish in this process
+            gd.use_parallel_export = False
+
+            report_value, report_string = \
+                bad_setup_check(context, active_export=True)
+            if report_value:
+                result["error"] = report_string
+                return result
+
+            status = bpy.ops.grab_doc.export_maps()
+            result["status"] = list(status)[0]
+            for bake_map in get_bake_maps():
+                path = os.path.join(
+                    bpy.path.abspath(gd.export_path),
+                    f"{gd.export_name}_{bake_map.suffix}{get_format()}"
+                )
+                result["maps"].append({
+                    "id": bake_map.ID,
+                    "path": path,
+                    "exported": os.path.exists(path)
+                })
+    # NOTE: Any failure is reported per job so the rest still run
+    except Exception as error:
+        result["status"] = 'CANCELLED'
+        result["error"] = str(error)
+        result["traceback"] = traceback.format_exc()
+    finally:
+        result["time"] = round(time.time() - start, 2)
+    return result
+
+
+def run_jobs(jobs: list[dict]) -> list[dict]:
+    results = []
+    for job in jobs:
+        print(f"{Global.FLAG_PREFIX}Baking {job['file']}")
+        results.append(run_job(job))
+    return results
+
+
+def run_chunked(
+        args: argparse.Namespace, jobs: list[dict]
+    ) -> list[dict]:
+    """Spread jobs over Blender processes that each handle
+    `files_per_process` files, running `processes` at once"""
+    report_dir = os.path.dirname(os.path.abspath(args.report))
+    chunks = [
+        (start, min(args.files_per_process, len(jobs) - start))
+        for start in range(0, len(jobs), args.files_per_process)
+    ]
+
+    pending = list(enumerate(chunks))
+    running = []
+    results = []
+    while pending or running:
+        while pending and len(running) < args.processes:
+            idx, (start, count) = pending.pop(0)
+            chunk_report = os.path.join(report_dir, f".grabdoc_chunk_{idx}.json")
+            command = get_blender_command(
+                __name__,
+                script_args=(
+                    "--manifest", args.manifest,
+                    "--report", chunk_report,
+                    "--start", str(start),
+                    "--count", str(count)
+                )
+            )
+            running.append(
+                (subprocess.Popen(command), chunk_report, jobs[start:start+count])
+            )
+        for process, chunk_report, chunk_jobs in running[:]:
+            if process.poll() is None:
+                continue
+            running.remove((process, chunk_report, chunk_jobs))
+            if os.path.exists(chunk_report):
+                with open(chunk_report, encoding='utf-8') as file:
+                    results.extend(json.load(file)["jobs"])
+                os.remove(chunk_report)
+                continue
+            # NOTE: Process crashed before writing its report
+            results.extend({
+                "file": job["file"],
+                "scene": job.get("scene"),
+                "output": job["output"],
+                "status": 'CANCELLED',
+                "error": f"Blender exited with code {process.returncode}",
+                "traceback": None,
+                "maps": []
+            } for job in chunk_jobs)
+        time.sleep(.5)
+    return results
+
+
+def main() -> None:
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(
+        prog="GrabDoc batch", description="Bake many .blend files headlessly"
+    )
+    parser.add_argument("--manifest", required=True)
+    parser.add_argument("--report", required=True)
+    parser.add_argument(
+        "--files-per-process", type=int, default=0,
+        help="Reuse one Blender process per N files, 0 bakes in this process"
+    )
+    parser.add_argument(
+        "--processes", type=int, default=1,
+        help="Amount of Blender processes running at once"
+    )
+    parser.add_argument("--start", type=int, default=0)
+    parser.add_argument("--count", type=int, default=-1)
+    args = parser.parse_args(argv)
+
+    start = time.time()
+    jobs = load_manifest(args.manifest)
+    if args.files_per_process > 0:
+        results = run_chunked(args, jobs)
+    else:
+        end = None if args.count < 0 else args.start + args.count
+        results = run_jobs(jobs[args.start:end])
+    write_report(args.report, results, start)
+
+    if any(result["status"] != 'FINISHED' for result in results):
+        sys.exit(1)
@@ -0,0 +1,275 @@
+"""Benchmark GrabDoc hot paths on a generated scene in background mode.
+
+Usage:
+    blender -b --factory-startup --addons GrabDoc --python-expr
+    "import importlib; importlib.import_module('GrabDoc.utils.benchmark').main()"
+    -- --objects 5000 --materials 50 --slots 2 --vertices 400
+    --output results.json
+
+Results are written as JSON so runs can be compared across commits.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import random
+import argparse
+import tempfile
+import subprocess
+import statistics
+
+import numpy
+import bmesh
+import bpy
+from bpy.types import Context, Material, Object
+
+from ..constants import Global
+from .generic import get_format
+from .render import (
+    get_rendered_objects,
+    find_rendered_objects,
+    clear_rendered_cache,
+    find_tallest_object
+)
+from .node import apply_node_to_objects, node_cleanup
+from .scene import scene_setup
+from .baker import get_bake_maps
+
+
+def clear_scene() -> None:
+    """Remove all objects, meshes & materials. Only allowed in an
+    unsaved background session, so no user file can lose its data"""
+    if not bpy.app.background or bpy.data.filepath:
+        raise RuntimeError(
+            "The benchmark only runs in background mode without a file, "
+            "e.g. `blender -b --factory-startup`"
+        )
+    for ob in bpy.data.objects:
+        bpy.data.objects.remove(ob)
+    for mesh in bpy.data.meshes:
+        bpy.data.meshes.remove(mesh)
+    for material in bpy.data.materials:
+        bpy.data.materials.remove(material)
+
+
+def generate_materials(count: int) -> list[Material]:
+    materials = []
+    for idx in range(count):
+        material = bpy.data.materials.new(f"Benchmark Material {idx}")
+        material.use_nodes = True
+        bsdf = material.node_tree.nodes.get("Principled BSDF")
+        bsdf.inputs["Base Color"].default_value = \
+            (random.random(), random.random(), random.random(), 1)
+        bsdf.inputs["Roughness"].default_value = random.random()
+        bsdf.inputs["Metallic"].default_value = random.random()
+        materials.append(material)
+    return materials
+
+
+def generate_objects(
+        context: Context,
+        count: int,
+        materials: list[Material],
+        slots: int,
+        vertices: int
+    ) -> list[Object]:
+    """Scatter grid meshes with the given vertex count
+    and material slots inside the trim camera's view"""
+    segments = max(2, int(vertices ** .5))
+    bm = bmesh.new()
+    bmesh.ops.create_grid(
+        bm, x_segments=segments, y_segments=segments, size=.5
+    )
+    # NOTE: Give every object some height for the height map
+    for vert in bm.verts:
+        vert.co.z = random.random() * .1
+    base_mesh = bpy.data.meshes.new("Benchmark Mesh")
+    bm.to_mesh(base_mesh)
+    bm.free()
+
+    scale = context.scene.gd.scale
+    coll = context.scene.collection
+    columns = max(1, int(count ** .5))
+    objects = []
+    for idx in range(count):
+        mesh = base_mesh.copy()
+        for slot in range(slots):
+            mesh.materials.append(materials[(idx + slot) % len(materials)])
+        if slots > 1:
+            material_index = numpy.arange(
+                len(mesh.polygons), dtype=numpy.int32
+            ) % slots
+            mesh.polygons.foreach_set("material_index", material_index)
+
+        ob = bpy.data.objects.new(f"Benchmark Object {idx}", mesh)
+        ob.location = (
+            ((idx % columns + .5) / columns - .5) * scale,
+            ((idx // columns + .5) / columns - .5) * scale,
+            0
+        )
+        ob.scale = (scale / columns,) * 3
+        coll.objects.link(ob)
+        objects.append(ob)
+    bpy.data.meshes.remove(base_mesh)
+    return objects
+
+
+def generate_pack_images(resolution: int) -> list:
+    images = []
+    for idx in range(4):
+        image = bpy.data.images.new(
+            f"Benchmark Pack {idx}", resolution, resolution
+        )
+        image.pixels.foreach_set(
+            numpy.random.random(resolution * resolution * 4)
+            .astype(numpy.float32)
+        )
+        images.append(image)
+    return images
+
+
+def time_call(func, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {
+        "min": min(timings),
+        "mean": statistics.mean(timings),
+        "max": max(timings),
+        "runs": timings
+    }
+
+
+def get_git_commit() -> str | None:
+    addon_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        return subprocess.check_output(
+            ("git", "rev-parse", "HEAD"),
+            cwd=addon_dir, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def set_fixed_render_settings(context: Context, args: argparse.Namespace):
+    """Use CPU Cycles with fixed samples & threads for comparable timings"""
+    gd = context.scene.gd
+    render = context.scene.render
+    context.scene.cycles.device = 'CPU'
+    render.threads_mode = 'FIXED'
+    render.threads = args.threads
+    gd.resolution_x = gd.resolution_y = args.resolution
+    gd.use_export_cache = False
+    gd.use_export_trace = False
+    gd.use_pack_maps = False
+    for bake_map in get_bake_maps(enabled_only=False):
+        bake_map.reimport = False
+        if 'cycles' in [engine[0] for engine in bake_map.SUPPORTED_ENGINES]:
+            bake_map.engine = 'cycles'
+        bake_map.samples_cycles = args.samples
+
+
+def run_benchmarks(context: Context, args: argparse.Namespace) -> dict:
+    from ..operators.operators import pack_image_channels
+
+    gd = context.scene.gd
+    timings = {}
+
+    clear_scene()
+    timings["scene_setup (empty)"] = \
+        time_call(lambda: scene_setup(None, context), args.repeat)
+
+    materials = generate_materials(args.materials)
+    start = time.perf_counter()
+    objects = generate_objects(
+        context, args.objects, materials, args.slots, args.vertices
+    )
+    generate_time = time.perf_counter() - start
+
+    timings["scene_setup"] = \
+        time_call(lambda: scene_setup(None, context), args.repeat)
+    timings["find_rendered_objects"] = \
+        time_call(find_rendered_objects, args.repeat)
+    clear_rendered_cache()
+    get_rendered_objects()
+    timings["get_rendered_objects (cached)"] = \
+        time_call(get_rendered_objects, args.repeat)
+    timings["find_tallest_object"] = \
+        time_call(lambda: find_tallest_object(objects), args.repeat)
+
+    rendered_objects = get_rendered_objects()
+    for bake_map in get_bake_maps():
+        if not bake_map.NODE:
+            continue
+        timings[f"apply_node_to_objects ({bake_map.ID})"] = time_call(
+            lambda: apply_node_to_objects(bake_map.NODE, rendered_objects), 1
+        )
+        timings[f"node_cleanup ({bake_map.ID})"] = \
+            time_call(lambda: node_cleanup(bake_map.NODE), 1)
+
+    images = generate_pack_images(args.resolution)
+    pack_order = [(image, (0, channel)) for channel, image in enumerate(images)]
+    timings["pack_image_channels"] = time_call(
+        lambda: bpy.data.images.remove(
+            pack_image_channels(pack_order, "Benchmark Packed")
+        ),
+        args.repeat
+    )
+    for image in images:
+        bpy.data.images.remove(image)
+
+    if not args.skip_export:
+        set_fixed_render_settings(context, args)
+        scene_setup(None, context)
+        export_path = tempfile.mkdtemp(prefix="grabdoc_benchmark_")
+        gd.export_path = export_path
+        timings["export_maps"] = time_call(
+            bpy.ops.grab_doc.export_maps, args.repeat
+        )
+        shutil.rmtree(export_path, ignore_errors=True)
+
+    return {
+        "blender": bpy.app.version_string,
+        "commit": get_git_commit(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "params": vars(args),
+        "generate_time": generate_time,
+        "rendered_objects": len(rendered_objects),
+        "format": get_format(),
+        "timings": timings
+    }
+
+
+def main() -> None:
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(
+        prog="GrabDoc benchmark", description="Time GrabDoc hot paths"
+    )
+    parser.add_argument("--objects", type=int, default=500)
+    parser.add_argument("--materials", type=int, default=20)
+    parser.add_argument("--slots", type=int, default=1)
+    parser.add_argument("--vertices", type=int, default=100)
+    parser.add_argument("--resolution", type=int, default=512)
+    parser.add_argument("--samples", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-export", action='store_true')
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args(argv)
+
+    random.seed(args.seed)
+    numpy.random.seed(args.seed)
+
+    results = run_benchmarks(bpy.context, args)
+    for name, timing in results["timings"].items():
+        print(f"{Global.FLAG_PREFIX}{name}: {timing['mean']:.4f}s")
+    if args.output is None:
+        print(json.dumps(results, indent=4))
+        return
+    with open(args.output, "w", encoding='utf-8') as file:
+        json.dump(results, file, indent=4)
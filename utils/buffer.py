@@ -0,0 +1,234 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, Future
+
+import numpy
+import bpy
+from bpy.types import Context, Image
+
+from ..constants import Global
+from .baker import Baker
+from .generic import mute_compositor_nodes, restore_compositor_nodes
+from .pack import (
+    write_pixels,
+    get_oiio_format,
+    get_oiio_attributes,
+    is_streaming_pack_supported
+)
+from .trace import span
+
+
+VIEWER_PREFIX = Global.PREFIX + "Viewer "
+VIEWER_IMAGE_NAME = "Viewer Node"
+RENDER_IMAGE_NAME = Global.FLAG_PREFIX + "Single Render"
+
+
+def can_render_to_buffer(bake_map: Baker) -> bool:
+    """Viewer pixels are scene linear, so only view
+    transforms that can be applied by hand are supported"""
+    return bake_map.VIEW_TRANSFORM in {'Standard', 'Raw'} \
+        and bake_map.contrast == 'None'
+
+
+def srgb_encode(pixels: numpy.ndarray) -> numpy.ndarray:
+    """Apply the sRGB transfer function to the RGB channels in place"""
+    rgb = numpy.clip(pixels[..., :3], 0, 1)
+    pixels[..., :3] = numpy.where(
+        rgb <= .0031308,
+        rgb * 12.92,
+        1.055 * numpy.power(rgb, 1 / 2.4) - .055
+    )
+    return pixels
+
+
+def viewer_init(context: Context) -> dict:
+    """Route the render result into a compositor Viewer node,
+    muting the user's own nodes so none of them run or write files"""
+    scene = context.scene
+    saved = {
+        "use_nodes": scene.use_nodes,
+        "use_compositing": scene.render.use_compositing
+    }
+    scene.use_nodes = True
+    scene.render.use_compositing = True
+    tree = scene.node_tree
+    links = tree.links
+    saved["mutes"] = mute_compositor_nodes(tree)
+
+    render_layers = tree.nodes.new('CompositorNodeRLayers')
+    render_layers.name = VIEWER_PREFIX + "Render Layers"
+    render_layers.scene = scene
+    render_layers.layer = context.view_layer.name
+
+    viewer = tree.nodes.new('CompositorNodeViewer')
+    viewer.name = VIEWER_PREFIX + "Viewer"
+    links.new(viewer.inputs['Image'], render_layers.outputs['Image'])
+    if 'Alpha' in viewer.inputs:
+        links.new(viewer.inputs['Alpha'], render_layers.outputs['Alpha'])
+    saved["active"] = tree.nodes.active
+    tree.nodes.active = viewer
+
+    # NOTE: Rendering with compositing requires a composite node,
+    # this also keeps the render result the raw, uncomposited image
+    composite = tree.nodes.new('CompositorNodeComposite')
+    composite.name = VIEWER_PREFIX + "Composite"
+    links.new(composite.inputs['Image'], render_layers.outputs['Image'])
+    if 'Alpha' in composite.inputs:
+        links.new(composite.inputs['Alpha'], render_layers.outputs['Alpha'])
+    return saved
+
+
+def viewer_cleanup(context: Context, saved: dict) -> None:
+    scene = context.scene
+    tree = scene.node_tree
+    for node in [node for node in tree.nodes
+                 if node.name.startswith(VIEWER_PREFIX)]:
+        tree.nodes.remove(node)
+    restore_compositor_nodes(tree, saved["mutes"])
+    if saved["active"] is not None:
+        tree.nodes.active = saved["active"]
+    scene.use_nodes = saved["use_nodes"]
+    scene.render.use_compositing = saved["use_compositing"]
+
+
+def get_viewer_pixels() -> numpy.ndarray:
+    """Get the Viewer node pixels as a (height, width, 4)
+    float array, rows starting at the bottom of the image"""
+    image = bpy.data.images[VIEWER_IMAGE_NAME]
+    width, height = image.size
+    pixels = numpy.empty(width * height * 4, dtype=numpy.float32)
+    image.pixels.foreach_get(pixels)
+    return pixels.reshape(height, width, 4)
+
+
+def render_to_buffer(
+        context: Context, bake_map: Baker, linear: bool | None=None
+    ) -> numpy.ndarray:
+    """Render the trim camera and keep the result in memory,
+    encoded like the file the bake map would be written to
+    unless `linear` is given"""
+    context.scene.camera = bpy.data.objects[Global.TRIM_CAMERA_NAME]
+    saved = viewer_init(context)
+    try:
+        bpy.ops.render.render()
+        pixels = get_viewer_pixels()
+    finally:
+        viewer_cleanup(context, saved)
+    if linear is None:
+        linear = context.scene.gd.format == 'OPEN_EXR'
+    if bake_map.VIEW_TRANSFORM == 'Standard' and not linear:
+        srgb_encode(pixels)
+    return pixels
+
+
+def set_render_image(
+        pixels: numpy.ndarray,
+        colorspace: str | None='sRGB',
+        float_buffer: bool=False
+    ) -> Image:
+    """Update the persistent single render image in place,
+    only reallocating it when the resolution changes.
+
+    Float buffers hold scene linear pixels, so they keep
+    their default color space unless one is given"""
+    height, width = pixels.shape[:2]
+    image = bpy.data.images.get(RENDER_IMAGE_NAME)
+    if image is not None and (image.source != 'GENERATED'
+                              or image.is_float != float_buffer):
+        bpy.data.images.remove(image)
+        image = None
+    if image is None:
+        image = bpy.data.images.new(
+            RENDER_IMAGE_NAME,
+            width,
+            height,
+            alpha=True,
+            float_buffer=float_buffer
+        )
+    elif tuple(image.size) != (width, height):
+        image.scale(width, height)
+    if colorspace is not None:
+        image.colorspace_settings.name = colorspace
+    image.pixels.foreach_set(pixels.ravel())
+    image.update()
+    return image
+
+
+def show_image(image: Image) -> None:
+    """Show the image in the Image Editor already displaying it,
+    only opening a new window if there isn't one"""
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type != 'IMAGE_EDITOR' \
+            or area.spaces.active.image != image:
+                continue
+            area.tag_redraw()
+            return
+    bpy.ops.screen.userpref_show("INVOKE_DEFAULT")
+    area = bpy.context.window_manager.windows[-1].screen.areas[0]
+    area.type = "IMAGE_EDITOR"
+    area.spaces.active.image = image
+
+
+class BufferWriter():
+    """Encode & write rendered buffers on background threads so
+    the next map can be set up and rendered in the meantime.
+
+    Image codecs release the GIL, so writes overlap with rendering.
+    Call `drain` before anything reads the written files back"""
+
+    # NOTE: Other formats have settings (TGA depth & RLE, TIFF
+    # codecs) the writer doesn't carry over, they use `save_render`
+    FORMATS = {'PNG', 'OPEN_EXR'}
+
+    def __init__(self, context: Context, max_workers: int | None=None):
+        # NOTE: Scene settings are read here, never from writer threads
+        self.oiio_format = get_oiio_format(context)
+        self.attributes = get_oiio_attributes(context)
+        self.channels = \
+            4 if context.scene.render.image_settings.color_mode == 'RGBA' else 3
+        if max_workers is None:
+            max_workers = min(4, os.cpu_count() or 1)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.futures = {}
+
+    @classmethod
+    def is_supported(cls, context: Context) -> bool:
+        return is_streaming_pack_supported() \
+            and context.scene.gd.format in cls.FORMATS
+
+    def write(
+            self, pixels: numpy.ndarray, path: str, attributes: dict
+        ) -> str:
+        with span("file write", path=os.path.basename(path)):
+            return write_pixels(
+                pixels[..., :self.channels],
+                path,
+                self.oiio_format,
+                attributes
+            )
+
+    def submit(
+            self,
+            pixels: numpy.ndarray,
+            path: str,
+            colorspace: str | None=None
+        ) -> Future:
+        """Queue a write, tagging display referred files with
+        their color space so readers don't assume linear data"""
+        attributes = dict(self.attributes)
+        if colorspace is not None:
+            attributes["oiio:ColorSpace"] = colorspace
+        future = self.executor.submit(self.write, pixels, path, attributes)
+        self.futures[path] = future
+        return future
+
+    def drain(self) -> list[tuple[str, Exception]]:
+        """Wait for all pending writes and return any that failed"""
+        errors = []
+        for path, future in self.futures.items():
+            error = future.exception()
+            if error is not None:
+                errors.append((path, error))
+        self.futures.clear()
+        self.executor.shutdown(wait=True)
+        return errors
@@ -0,0 +1,225 @@
+import os
+import json
+import hashlib
+
+import numpy
+import bpy
+from bpy.types import Context, Object, Material, NodeTree, Image
+
+from ..constants import Global
+from .generic import get_format
+
+
+CACHE_MANIFEST_NAME = ".grabdoc_cache.json"
+
+# NOTE: Scene properties that change the look of every bake map
+SCENE_HASH_PROPS = (
+    "scale", "filter", "filter_width", "resolution_x", "resolution_y",
+    "format", "depth", "png_compression", "exr_depth", "tga_depth",
+    "coll_rendered", "use_aov_export"
+)
+
+# NOTE: Baker properties that don't change the rendered image
+BAKER_IGNORED_PROPS = {"rna_type", "enabled", "reimport", "visibility"}
+
+
+def hash_properties(hasher, data, ignored: set | None=None) -> None:
+    """Hash all simple RNA property values of the given data block"""
+    for prop in data.bl_rna.properties:
+        if ignored is not None and prop.identifier in ignored:
+            continue
+        if prop.type in {'POINTER', 'COLLECTION'}:
+            continue
+        value = getattr(data, prop.identifier)
+        if hasattr(value, '__len__') and not isinstance(value, str):
+            value = tuple(value)
+        hasher.update(f"{prop.identifier}={value};".encode())
+
+
+def hash_image(hasher, image: Image) -> None:
+    """Hash an image by its packed data or the modification
+    time & size of its file, so edits on disk are picked up"""
+    hasher.update(
+        f"{image.name}:{image.source}:{image.filepath}:"
+        f"{image.is_dirty};".encode()
+    )
+    if image.packed_file is not None:
+        hasher.update(image.packed_file.data)
+        return
+    if image.source not in {'FILE', 'SEQUENCE', 'MOVIE', 'TILED'}:
+        return
+    path = bpy.path.abspath(image.filepath, library=image.library)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        hasher.update(b"missing;")
+        return
+    hasher.update(f"{stat.st_mtime_ns}:{stat.st_size};".encode())
+
+
+def hash_node_tree(
+        hasher, node_tree: NodeTree, visited: set | None=None
+    ) -> None:
+    """Hash nodes, socket values and links of a node tree and its groups"""
+    if visited is None:
+        visited = set()
+    if node_tree.name in visited:
+        return
+    visited.add(node_tree.name)
+
+    for node in node_tree.nodes:
+        hasher.update(f"{node.bl_idname}:{node.name};".encode())
+        hash_properties(hasher, node, {"rna_type", "location", "width",
+                                       "select", "dimensions"})
+        for socket in node.inputs:
+            if socket.is_linked or not hasattr(socket, 'default_value'):
+                continue
+            value = socket.default_value
+            if hasattr(value, '__len__') and not isinstance(value, str):
+                value = tuple(value)
+            hasher.update(f"{socket.identifier}={value};".encode())
+        if getattr(node, "image", None) is not None:
+            hash_image(hasher, node.image)
+        if getattr(node, "node_tree", None) is not None:
+            hash_node_tree(hasher, node.node_tree, visited)
+    for link in node_tree.links:
+        hasher.update(
+            f"{link.from_node.name}.{link.from_socket.identifier}>"
+            f"{link.to_node.name}.{link.to_socket.identifier};".encode()
+        )
+
+
+def hash_material(material: Material) -> str:
+    hasher = hashlib.sha1(material.name.encode())
+    hash_properties(hasher, material, {"rna_type", "preview_render_type"})
+    if material.use_nodes and material.node_tree is not None:
+        hash_node_tree(hasher, material.node_tree)
+    return hasher.hexdigest()
+
+
+def hash_object_data(hasher, ob: Object, depsgraph) -> None:
+    """Hash the evaluated mesh data of an object"""
+    ob_eval = ob.evaluated_get(depsgraph)
+    try:
+        mesh = ob_eval.to_mesh()
+    except RuntimeError:
+        # NOTE: Object can't be evaluated as mesh, e.g. speakers
+        hasher.update(b"no mesh;")
+        return
+    if mesh is None:
+        return
+    try:
+        co = numpy.empty(len(mesh.vertices) * 3, dtype=numpy.float32)
+        mesh.vertices.foreach_get("co", co)
+        hasher.update(co.tobytes())
+
+        vertex_index = numpy.empty(len(mesh.loops), dtype=numpy.int32)
+        mesh.loops.foreach_get("vertex_index", vertex_index)
+        hasher.update(vertex_index.tobytes())
+
+        normals = numpy.empty(len(mesh.loops) * 3, dtype=numpy.float32)
+        mesh.loops.foreach_get("normal", normals)
+        hasher.update(normals.tobytes())
+
+        if mesh.uv_layers.active is not None:
+            uv = numpy.empty(len(mesh.loops) * 2, dtype=numpy.float32)
+            mesh.uv_layers.active.uv.foreach_get("vector", uv)
+            hasher.update(uv.tobytes())
+    finally:
+        ob_eval.to_mesh_clear()
+
+
+def get_objects_hash(context: Context, objects: set[Object]) -> str:
+    """Hash everything shared by all bake maps: rendered objects,
+    their evaluated meshes, transforms and materials"""
+    depsgraph = context.evaluated_depsgraph_get()
+    hasher = hashlib.sha1()
+    material_hashes = {}
+    for ob in sorted(objects, key=lambda ob: ob.name):
+        hasher.update(f"{ob.name}:{ob.type};".encode())
+        hasher.update(
+            numpy.array(ob.matrix_world, dtype=numpy.float32).tobytes()
+        )
+        hash_object_data(hasher, ob, depsgraph)
+        for slot in ob.material_slots:
+            material = slot.material
+            if material is None:
+                hasher.update(b"None;")
+                continue
+            if material.name not in material_hashes:
+                material_hashes[material.name] = hash_material(material)
+            hasher.update(material_hashes[material.name].encode())
+
+    # NOTE: Instanced objects are hashed by their source, so
+    # moved instances & instancers only show up in here
+    instance_matrices = []
+    for instance in depsgraph.object_instances:
+        if not instance.is_instance:
+            continue
+        parent = instance.parent.original
+        ob = instance.instance_object.original
+        if ob is None or ob.name not in bpy.data.objects:
+            # NOTE: Geometry node instances of raw geometry
+            ob = parent
+        if ob not in objects and parent not in objects:
+            continue
+        instance_matrices.append((
+            f"{ob.name}:{parent.name};",
+            numpy.array(instance.matrix_world, dtype=numpy.float32).tobytes()
+        ))
+    for name, matrix in sorted(instance_matrices):
+        hasher.update(name.encode())
+        hasher.update(matrix)
+
+    camera = bpy.data.objects.get(Global.TRIM_CAMERA_NAME)
+    if camera is not None:
+        hasher.update(
+            numpy.array(camera.matrix_world, dtype=numpy.float32).tobytes()
+        )
+    return hasher.hexdigest()
+
+
+def get_map_hash(context: Context, bake_map, objects_hash: str) -> str:
+    """Hash all inputs affecting a single bake map"""
+    gd = context.scene.gd
+    hasher = hashlib.sha1(objects_hash.encode())
+    hasher.update(f"{bake_map.ID}:{get_format()};".encode())
+    for prop in SCENE_HASH_PROPS:
+        hasher.update(f"{prop}={getattr(gd, prop)};".encode())
+    hash_properties(hasher, bake_map, BAKER_IGNORED_PROPS)
+    return hasher.hexdigest()
+
+
+def get_cache_manifest_path(context: Context) -> str:
+    export_path = bpy.path.abspath(context.scene.gd.export_path)
+    return os.path.join(export_path, CACHE_MANIFEST_NAME)
+
+
+def load_cache_manifest(context: Context) -> dict:
+    path = get_cache_manifest_path(context)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache_manifest(context: Context, manifest: dict) -> None:
+    with open(get_cache_manifest_path(context), "w", encoding='utf-8') as file:
+        json.dump(manifest, file, indent=4)
+
+
+def get_map_file_name(context: Context, bake_map) -> str:
+    return f"{context.scene.gd.export_name}_{bake_map.suffix}{get_format()}"
+
+
+def is_map_cached(
+        context: Context, bake_map, manifest: dict, map_hash: str
+    ) -> bool:
+    """Check if the map was exported with the same inputs
+    and its file still exists in the export path"""
+    name = get_map_file_name(context, bake_map)
+    path = os.path.join(bpy.path.abspath(context.scene.gd.export_path), name)
+    return manifest.get(name) == map_hash and os.path.exists(path)
@@ -1,5 +1,8 @@
 import os
 import re
+import math
+from functools import wraps
+from contextlib import contextmanager
 from pathlib import Path
 from inspect import getframeinfo, stack
 
@@ -9,6 +12,33 @@ from bpy.types import Context, Operator
 from ..constants import Global, Error
 
 
+# NOTE: Set while many properties are assigned at once, e.g. presets
+updates_suspended = False
+
+
+@contextmanager
+def suspend_updates():
+    """Skip `suspendable` property update callbacks
+    until the caller applies one consolidated update"""
+    global updates_suspended
+    updates_suspended = True
+    try:
+        yield
+    finally:
+        updates_suspended = False
+
+
+def suspendable(update):
+    """Decorate a property update callback to be
+    skipped while updates are suspended"""
+    @wraps(update)
+    def wrapper(*args, **kwargs):
+        if updates_suspended:
+            return None
+        return update(*args, **kwargs)
+    return wrapper
+
+
 class OpInfo:
     bl_options = {'REGISTER', 'UNDO'}
     bl_label = ""
@@ -29,6 +59,38 @@ class UseSelectedOnly():
         )
 
 
+def set_if_changed(data, name: str, value) -> bool:
+    """Assign an RNA property only if its value differs, avoiding
+    depsgraph updates & viewport restarts from redundant writes"""
+    current = getattr(data, name)
+    # NOTE: Float properties are stored in single precision
+    if isinstance(value, float) and math.isclose(current, value, rel_tol=1e-6):
+        return False
+    if current == value:
+        return False
+    setattr(data, name, value)
+    return True
+
+
+def mute_compositor_nodes(tree) -> dict[str, bool]:
+    """Mute every existing compositor node so the user's own Composite
+    & File Output nodes don't run or write files during bake renders.
+
+    Returns the previous mute states for `restore_compositor_nodes`"""
+    saved = {}
+    for node in tree.nodes:
+        saved[node.name] = node.mute
+        node.mute = True
+    return saved
+
+
+def restore_compositor_nodes(tree, saved: dict[str, bool]) -> None:
+    for name, mute in saved.items():
+        node = tree.nodes.get(name)
+        if node is not None:
+            node.mute = mute
+
+
 def export_plane(context: Context) -> None:
     """Export the grabdoc background plane for external use"""
     gd = context.scene.gd
@@ -1,8 +1,11 @@
+import os
 from typing import Iterable
 
 import bpy
 from bpy.types import (
+    Context,
     Object,
+    Node,
     ShaderNodeGroup,
     NodeSocket,
     NodeTree,
@@ -10,6 +13,7 @@ from bpy.types import (
 )
 
 from ..constants import Global
+from .generic import get_create_addon_temp_dir
 
 
 def generate_shader_interface(tree: NodeTree, inputs: dict) -> None:
@@ -18,6 +22,12 @@ def generate_shader_interface(tree: NodeTree, inputs: dict) -> None:
         socket_type="NodeSocketShader",
         in_out='OUTPUT'
     )
+    # NOTE: Unshaded map value, used for AOV exports
+    tree.interface.new_socket(
+        name=Global.AOV_SOCKET_NAME,
+        socket_type="NodeSocketColor",
+        in_out='OUTPUT'
+    )
     saved_links = tree.interface.new_panel(
         name="Saved Links",
         description="Stored links to restore original socket links later",
@@ -32,9 +42,39 @@ def generate_shader_interface(tree: NodeTree, inputs: dict) -> None:
         )
 
 
+# NOTE: Bump whenever a node group built by `build_node_groups` changes
+NODE_LIBRARY_VERSION = 1
+NODE_GROUP_NAMES = (*Global.SHADER_MAP_NAMES, Global.HEIGHT_NODE)
+# NOTE: Custom properties written onto library node groups
+LIBRARY_VERSION_PROP = "grabdoc_library_version"
+LIBRARY_BLENDER_VERSION_PROP = "grabdoc_blender_version"
+
+# NOTE: Material output inputs only change between Blender versions
+material_output_inputs_cache: dict | None = None
+
+# NOTE: Material edits of each node setup keyed by node group name,
+# so cleanup only visits the materials a setup touched. Materials
+# are keyed by pointer, so renaming them in between is fine
+material_journals: dict[str, dict[int, dict]] = {}
+
+
 def get_material_output_inputs() -> dict:
-    """Create a dummy node group and capture
-    the default material output inputs."""
+    """Capture the default material output inputs from the saved
+    links of an existing node group, or else a dummy node group."""
+    global material_output_inputs_cache
+    if material_output_inputs_cache is not None:
+        return material_output_inputs_cache
+    tree = bpy.data.node_groups.get(Global.NORMAL_NODE)
+    if tree is not None:
+        material_output_inputs = {
+            item.name: item.socket_type
+            for item in tree.interface.items_tree
+            if item.item_type == 'SOCKET' and item.in_out == 'INPUT'
+            and getattr(item.parent, "name", None) == "Saved Links"
+        }
+        if material_output_inputs:
+            material_output_inputs_cache = material_output_inputs
+            return material_output_inputs
     tree = bpy.data.node_groups.new(
         'Material Output',
         'ShaderNodeTree'
@@ -50,11 +90,176 @@ def get_material_output_inputs() -> dict:
         material_output_inputs[node_input.name] = \
             f'NodeSocket{node_input.type.capitalize()}'
     bpy.data.node_groups.remove(tree)
+    material_output_inputs_cache = material_output_inputs
     return material_output_inputs
 
 
+def get_journal_entry(setup_type: str, material: Material) -> dict:
+    """Get the journal entry of a material for the given node setup,
+    recording its original state on first access"""
+    journal = material_journals.setdefault(setup_type, {})
+    key = material.as_pointer()
+    if key not in journal:
+        journal[key] = {
+            "name": material.name,
+            "use_nodes": material.use_nodes,
+            "blend_method": material.blend_method,
+            "nodes": [],
+            "links": []
+        }
+    return journal[key]
+
+
+def has_node_setup(mat: Material, setup_type: str) -> bool:
+    return mat.node_tree is not None and setup_type in mat.node_tree.nodes
+
+
+def begin_journal_entry(setup_type: str, material: Material) -> dict | None:
+    """Get a new journal entry for adding the node setup to a material,
+    or None if it already has it. Setups left over in a saved file,
+    e.g. during Map Preview, are kept & removed again on cleanup"""
+    journal = material_journals.setdefault(setup_type, {})
+    if material.as_pointer() in journal:
+        return None
+    entry = get_journal_entry(setup_type, material)
+    if has_node_setup(material, setup_type):
+        entry["legacy"] = True
+        return None
+    return entry
+
+
+def begin_journal_entries(
+        setup_type: str,
+        material_index: tuple[dict[str, list[Object]], list[Object]]
+    ) -> list[tuple[Material, dict]]:
+    """Get new journal entries for adding the node setup to the indexed
+    materials, recording if the fallback material was created for it"""
+    is_new_fallback = Global.GD_MATERIAL_NAME not in bpy.data.materials
+    entries = []
+    for material in get_indexed_materials(material_index):
+        entry = begin_journal_entry(setup_type, material)
+        if entry is None:
+            continue
+        entry["created"] = is_new_fallback \
+            and material.name == Global.GD_MATERIAL_NAME
+        entries.append((material, entry))
+    return entries
+
+
+def get_journaled_materials(journal: dict) -> list[tuple[Material, dict]]:
+    """Resolve journal entries to their materials, only
+    scanning all materials if any were renamed or removed"""
+    materials = []
+    by_pointer = None
+    for key, entry in journal.items():
+        material = bpy.data.materials.get(entry["name"])
+        if material is None or material.as_pointer() != key:
+            if by_pointer is None:
+                by_pointer = {
+                    material.as_pointer(): material
+                    for material in bpy.data.materials
+                }
+            material = by_pointer.get(key)
+        if material is not None:
+            materials.append((material, entry))
+    return materials
+
+
+def journal_output_links(entry: dict, output: Node) -> None:
+    """Record the original links of a material output node"""
+    for to_idx, node_input in enumerate(output.inputs):
+        for link in node_input.links:
+            from_idx = list(link.from_node.outputs).index(link.from_socket)
+            entry["links"].append(
+                (link.from_node.name, from_idx, output.name, to_idx)
+            )
+
+
+def restore_material(material: Material, entry: dict) -> None:
+    """Remove added nodes and restore original links & settings"""
+    if material.node_tree is not None:
+        nodes = material.node_tree.nodes
+        for name in entry["nodes"]:
+            node = nodes.get(name)
+            if node is not None:
+                nodes.remove(node)
+        for from_name, from_idx, to_name, to_idx in entry["links"]:
+            from_node = nodes.get(from_name)
+            to_node = nodes.get(to_name)
+            if from_node is None or to_node is None:
+                continue
+            material.node_tree.links.new(
+                to_node.inputs[to_idx], from_node.outputs[from_idx]
+            )
+    material.blend_method = entry["blend_method"]
+    material.use_nodes = entry["use_nodes"]
+
+
 def node_init() -> None:
-    """Initialize all node groups used within GrabDoc"""
+    """Initialize all node groups used within GrabDoc, appending
+    missing ones from the bundled node group library in a single load
+    and only building them through Python if the library is unusable"""
+    missing = [
+        name for name in NODE_GROUP_NAMES if name not in bpy.data.node_groups
+    ]
+    if not missing:
+        return
+    if load_node_library(missing):
+        # NOTE: Library values are defaults, not the scene settings
+        refresh_node_groups(bpy.context)
+        return
+    build_node_groups()
+
+
+def get_node_library_path() -> str:
+    """Get the node group library bundled with the add-on, generated
+    by `assets/build_node_library.py` with the lowest supported Blender"""
+    assets_path = get_create_addon_temp_dir("assets", create_dir=False)[1]
+    return os.path.join(
+        assets_path, f"node_groups_v{NODE_LIBRARY_VERSION}.blend"
+    )
+
+
+def is_library_node_group(tree: NodeTree) -> bool:
+    """Check if a node group comes from a library usable by the
+    running Blender version, as newer files may not load correctly"""
+    blender_version = tuple(tree.get(LIBRARY_BLENDER_VERSION_PROP, ()))
+    return tree.get(LIBRARY_VERSION_PROP) == NODE_LIBRARY_VERSION \
+        and bool(blender_version) and blender_version <= bpy.app.version
+
+
+def load_node_library(names: list[str]) -> bool:
+    """Append the given node groups from the library. Returns True if
+    all of them exist afterwards, otherwise nothing appended is kept"""
+    path = get_node_library_path()
+    if not os.path.exists(path):
+        return False
+    with bpy.data.libraries.load(path, link=False) as (data_from, data_to):
+        data_to.node_groups = [
+            name for name in data_from.node_groups if name in names
+        ]
+    trees = [tree for tree in data_to.node_groups if tree is not None]
+    if len(trees) == len(names) \
+    and all(is_library_node_group(tree) for tree in trees):
+        return True
+    # NOTE: Appending can rename groups on collision, so
+    # remove the appended data rather than looking up names
+    for tree in trees:
+        bpy.data.node_groups.remove(tree)
+    return False
+
+
+def refresh_node_groups(context: Context) -> None:
+    """Apply property driven node values from the bake map settings"""
+    gd = context.scene.gd
+    for name in Global.ALL_MAP_IDS:
+        bakers = getattr(gd, name, None)
+        if bakers:
+            bakers[0].refresh(context)
+
+
+def build_node_groups() -> None:
+    """Build all missing node groups node by node"""
     gd = bpy.context.scene.gd
 
     inputs = get_material_output_inputs()
@@ -144,6 +349,10 @@ def node_init() -> None:
         links.new(vec_mult.inputs["Vector"], vec_transform.outputs["Vector"])
         links.new(vec_add.inputs["Vector"], vec_mult.outputs["Vector"])
         links.new(group_output.inputs["Shader"], vec_add.outputs["Vector"])
+        links.new(
+            group_output.inputs[Global.AOV_SOCKET_NAME],
+            vec_add.outputs["Vector"]
+        )
 
         links.new(invert.inputs['Color'], group_input.outputs['Alpha'])
         links.new(subtract.inputs['Color2'], invert.outputs['Color'])
@@ -180,6 +389,10 @@ def node_init() -> None:
         links.new(color_ramp.inputs["Fac"], geometry.outputs["Pointiness"])
         links.new(emission.inputs["Color"], color_ramp.outputs["Color"])
         links.new(group_output.inputs["Shader"], emission.outputs["Emission"])
+        links.new(
+            group_output.inputs[Global.AOV_SOCKET_NAME],
+            color_ramp.outputs["Color"]
+        )
 
     if not Global.OCCLUSION_NODE in bpy.data.node_groups:
         tree = bpy.data.node_groups.new(
@@ -230,6 +443,10 @@ def node_init() -> None:
         links.new(gamma.inputs["Color"], ao.outputs["Color"])
         links.new(emission.inputs["Color"], gamma.outputs["Color"])
         links.new(group_output.inputs["Shader"], emission.outputs["Emission"])
+        links.new(
+            group_output.inputs[Global.AOV_SOCKET_NAME],
+            gamma.outputs["Color"]
+        )
 
     if not Global.HEIGHT_NODE in bpy.data.node_groups:
         tree = bpy.data.node_groups.new(
@@ -264,6 +481,9 @@ def node_init() -> None:
         links.new(map_range.inputs["Value"], camera.outputs["View Z Depth"])
         links.new(ramp.inputs["Fac"], map_range.outputs["Result"])
         links.new(group_output.inputs["Shader"], ramp.outputs["Color"])
+        links.new(
+            group_output.inputs[Global.AOV_SOCKET_NAME], ramp.outputs["Color"]
+        )
 
     if not Global.ALPHA_NODE in bpy.data.node_groups:
         tree = bpy.data.node_groups.new(
@@ -328,6 +548,9 @@ def node_init() -> None:
 
         links.new(emission.inputs["Color"], mix.outputs["Result"])
         links.new(group_output.inputs["Shader"], emission.outputs["Emission"])
+        links.new(
+            group_output.inputs[Global.AOV_SOCKET_NAME], mix.outputs["Result"]
+        )
 
     if not Global.COLOR_NODE in bpy.data.node_groups:
         tree = bpy.data.node_groups.new(
@@ -357,6 +580,10 @@ def node_init() -> None:
         links = tree.links
         links.new(emission.inputs["Color"], group_input.outputs["Base Color"])
         links.new(group_output.inputs["Shader"], emission.outputs["Emission"])
+        links.new(
+            group_output.inputs[Global.AOV_SOCKET_NAME],
+            group_input.outputs["Base Color"]
+        )
 
     if not Global.EMISSIVE_NODE in bpy.data.node_groups:
         tree = bpy.data.node_groups.new(
@@ -400,6 +627,10 @@ def node_init() -> None:
             group_output.inputs["Shader"],
             emission.outputs["Emission"]
         )
+        links.new(
+            group_output.inputs[Global.AOV_SOCKET_NAME],
+            group_input.outputs["Emission Color"]
+        )
 
     if not Global.ROUGHNESS_NODE in bpy.data.node_groups:
         tree = bpy.data.node_groups.new(
@@ -444,6 +675,10 @@ def node_init() -> None:
             group_output.inputs["Shader"],
             emission.outputs["Emission"]
         )
+        links.new(
+            group_output.inputs[Global.AOV_SOCKET_NAME],
+            invert.outputs["Color"]
+        )
 
     if not Global.METALLIC_NODE in bpy.data.node_groups:
         tree = bpy.data.node_groups.new(
@@ -480,6 +715,10 @@ def node_init() -> None:
             group_output.inputs["Shader"],
             emission.outputs["Emission"]
         )
+        links.new(
+            group_output.inputs[Global.AOV_SOCKET_NAME],
+            group_input.outputs["Metallic"]
+        )
 
 
 def create_node_links(
@@ -511,193 +750,262 @@ def create_node_links(
     return node_found
 
 
-def apply_node_to_objects(name: str, objects: Iterable[Object]) -> bool:
-    """Add node group to given object material slots"""
+def needs_fallback_material(ob: Object) -> bool:
+    return not ob.material_slots or "" in ob.material_slots
+
+
+def get_fallback_material() -> Material:
+    if Global.GD_MATERIAL_NAME in bpy.data.materials:
+        return bpy.data.materials[Global.GD_MATERIAL_NAME]
+    mat = bpy.data.materials.new(name=Global.GD_MATERIAL_NAME)
+    mat.use_nodes = True
+
+    # NOTE: Set default emission color
+    bsdf = mat.node_tree.nodes['Principled BSDF']
+    bsdf.inputs["Emission Color"].default_value = (0,0,0,1)
+    return mat
+
+
+def assign_fallback_materials(objects: Iterable[Object]) -> Material | None:
+    """Assign the GrabDoc material to objects without
+    materials or with empty material slots in one pass"""
+    objects = [ob for ob in objects if needs_fallback_material(ob)]
+    if not objects:
+        return None
+    mat = get_fallback_material()
+    for ob in objects:
+        # NOTE: We want to avoid removing empty material slots
+        # as they can be used for geometry masking
+        for slot in ob.material_slots:
+            if slot.name == '':
+                slot.material = mat
+        if not ob.active_material or ob.active_material.name == '':
+            ob.active_material = mat
+    return mat
+
+
+def get_material_index(
+        objects: Iterable[Object]
+    ) -> tuple[dict[str, list[Object]], list[Object]]:
+    """Map material names to the objects using them and collect
+    the objects that need the fallback material, so every
+    material is processed once no matter how many objects share it"""
+    index = {}
+    fallback_objects = []
+    for ob in objects:
+        if needs_fallback_material(ob):
+            fallback_objects.append(ob)
+        for slot in ob.material_slots:
+            if slot.material is None:
+                continue
+            index.setdefault(slot.material.name, []).append(ob)
+    return index, fallback_objects
+
+
+def get_indexed_materials(
+        material_index: tuple[dict[str, list[Object]], list[Object]]
+    ) -> list[Material]:
+    """Get the unique materials of an index, assigning
+    the fallback material to objects that need it"""
+    index, fallback_objects = material_index
+    materials = [
+        bpy.data.materials[name] for name in index
+        if name in bpy.data.materials
+    ]
+    fallback = assign_fallback_materials(fallback_objects)
+    if fallback is not None and fallback not in materials:
+        materials.append(fallback)
+    return materials
+
+
+def link_bsdf_inputs(
+        name: str,
+        node_group: ShaderNodeGroup,
+        source_node: Node,
+        material: Material
+    ) -> bool:
+    """Link the BSDF inputs a given map relies on to the GrabDoc node group"""
     gd = bpy.context.scene.gd
+    node_found = False
+    for original_input in source_node.inputs:
+        if name == Global.COLOR_NODE \
+        and original_input.name == Global.COLOR_NAME:
+            node_found = create_node_links(
+                input_name=original_input.name,
+                node_group=node_group,
+                original_input=original_input,
+                material=material
+            )
+        elif name == Global.EMISSIVE_NODE \
+        and original_input.name == "Emission Color":
+            node_found = create_node_links(
+                input_name=original_input.name,
+                node_group=node_group,
+                original_input=original_input,
+                material=material
+            )
+        elif name == Global.ROUGHNESS_NODE \
+        and original_input.name == Global.ROUGHNESS_NAME:
+            node_found = create_node_links(
+                input_name=original_input.name,
+                node_group=node_group,
+                original_input=original_input,
+                material=material
+            )
+        elif name == Global.METALLIC_NODE \
+        and original_input.name == Global.METALLIC_NAME:
+            node_found = create_node_links(
+                input_name=original_input.name,
+                node_group=node_group,
+                original_input=original_input,
+                material=material
+            )
+        elif name == Global.ALPHA_NODE \
+        and original_input.name == Global.ALPHA_NAME:
+            node_found = create_node_links(
+                input_name=original_input.name,
+                node_group=node_group,
+                original_input=original_input,
+                material=material
+            )
+            if original_input.name == 'Alpha' \
+            and material.blend_method == 'OPAQUE' \
+            and len(original_input.links):
+                material.blend_method = 'CLIP'
+        elif name == Global.NORMAL_NODE \
+        and original_input.name == "Normal":
+            node_found = create_node_links(
+                input_name=original_input.name,
+                node_group=node_group,
+                original_input=original_input,
+                material=material
+            )
+            if original_input.name == 'Alpha' \
+            and gd.normals[0].use_texture \
+            and material.blend_method == 'OPAQUE' \
+            and len(original_input.links):
+                material.blend_method = 'CLIP'
+
+        elif name == Global.OCCLUSION_NODE \
+        and original_input.name == "Normal":
+            node_found = create_node_links(
+                input_name=original_input.name,
+                node_group=node_group,
+                original_input=original_input,
+                material=material
+            )
+        elif node_found:
+            break
+    return node_found
+
+
+def apply_node_to_objects(
+        name: str,
+        objects: Iterable[Object],
+        material_index: tuple[dict[str, list[Object]], list[Object]] | None=None
+    ) -> bool:
+    """Add node group to given object material slots
+
+    A prebuilt `get_material_index` can be reused between bake maps"""
     operation_success = True
-    for ob in objects:
-        # If no material slots found or empty mat
-        # slots found, assign a material to it
-        if not ob.material_slots or "" in ob.material_slots:
-            if Global.GD_MATERIAL_NAME in bpy.data.materials:
-                mat = bpy.data.materials[Global.GD_MATERIAL_NAME]
-            else:
-                mat = bpy.data.materials.new(name=Global.GD_MATERIAL_NAME)
-                mat.use_nodes = True
+    if material_index is None:
+        material_index = get_material_index(objects)
 
-                # NOTE: Set default emission color
-                bsdf = mat.node_tree.nodes['Principled BSDF']
-                bsdf.inputs["Emission Color"].default_value = (0,0,0,1)
+    node_group = bpy.data.node_groups.get(name)
 
-            # NOTE: We want to avoid removing empty material slots
-            # as they can be used for geometry masking
-            for slot in ob.material_slots:
-                if slot.name == '':
-                    ob.material_slots[slot.name].material = mat
-            if not ob.active_material or ob.active_material.name == '':
-                ob.active_material = mat
+    # Add note next to node group explaining basic functionality
+    GD_text = bpy.data.texts.get('_grabdoc_ng_warning')
+    if GD_text is None:
+        GD_text = bpy.data.texts.new(name='_grabdoc_ng_warning')
+    GD_text.clear()
+    GD_text.write(Global.NG_NODE_WARNING)
 
-        for slot in ob.material_slots:
-            material = bpy.data.materials.get(slot.name)
-            material.use_nodes = True
+    for material, entry in begin_journal_entries(name, material_index):
+        material.use_nodes = True
 
-            nodes = material.node_tree.nodes
-            if name in nodes:
-                continue
+        nodes = material.node_tree.nodes
 
-            # Get output material node(s)
-            output_nodes = {
-                mat for mat in nodes if mat.type == 'OUTPUT_MATERIAL'
-            }
-            if not output_nodes:
-                output_nodes.append(
-                    nodes.new('ShaderNodeOutputMaterial')
-                )
-
-            node_group = bpy.data.node_groups.get(name)
-            for output in output_nodes:
-                passthrough = nodes.new('ShaderNodeGroup')
-                passthrough.node_tree = node_group
-                passthrough.location = (
-                    output.location[0],
-                    output.location[1] - 160
-                )
-                passthrough.name = node_group.name
-                passthrough.hide = True
-
-                # Add note next to node group explaining basic functionality
-                GD_text = bpy.data.texts.get('_grabdoc_ng_warning')
-                if GD_text is None:
-                    GD_text = bpy.data.texts.new(name='_grabdoc_ng_warning')
-
-                GD_text.clear()
-                GD_text.write(Global.NG_NODE_WARNING)
-
-                GD_frame = nodes.new('NodeFrame')
-                GD_frame.location = (
-                    output.location[0],
-                    output.location[1] - 195
-                )
-                GD_frame.name = node_group.name
-                GD_frame.text = GD_text
-                GD_frame.width = 1000
-                GD_frame.height = 150
-
-                # Link nodes
-                # TODO: This section needs to
-                # be seriously reconsidered
-                # inputs = get_material_output_inputs()
-                # if node_input.name in inputs:
-                #    for connection_name in inputs:
-                #        if node_input.name != connection_name:
-                #            continue
-                #        mat_slot.node_tree.links.new(
-                #            passthrough_ng.inputs[connection_name],
-                #            source_node.outputs[link.from_socket.name]
-                #        )
-                for output_material_input in output.inputs:
-                    for link in output_material_input.links:
-                        source_node = nodes.get(link.from_node.name)
-
-                        # Store original output material connections
-                        try:
-                            material.node_tree.links.new(
-                                passthrough.inputs[output_material_input.name],
-                                source_node.outputs[link.from_socket.name]
-                            )
-                        except KeyError:
-                            pass
-
-
-                        #Link dependencies from any BSDF node
-                        if name not in Global.SHADER_MAP_NAMES \
-                        or "BSDF" not in source_node.type:
-                            continue
-                        
-                        node_found = False
-                        for original_input in source_node.inputs:
-                            if name == Global.COLOR_NODE \
-                            and original_input.name == Global.COLOR_NAME:
-                                node_found = create_node_links(
-                                    input_name=original_input.name,
-                                    node_group=passthrough,
-                                    original_input=original_input,
-                                    material=material
-                                )
-                            elif name == Global.EMISSIVE_NODE \
-                            and original_input.name == "Emission Color":
-                                node_found = create_node_links(
-                                    input_name=original_input.name,
-                                    node_group=passthrough,
-                                    original_input=original_input,
-                                    material=material
-                                )
-                            elif name == Global.ROUGHNESS_NODE \
-                            and original_input.name == Global.ROUGHNESS_NAME:
-                                node_found = create_node_links(
-                                    input_name=original_input.name,
-                                    node_group=passthrough,
-                                    original_input=original_input,
-                                    material=material
-                                )
-                            elif name == Global.METALLIC_NODE \
-                            and original_input.name == Global.METALLIC_NAME:
-                                node_found = create_node_links(
-                                    input_name=original_input.name,
-                                    node_group=passthrough,
-                                    original_input=original_input,
-                                    material=material
-                                )
-                            elif name == Global.ALPHA_NODE \
-                            and original_input.name == Global.ALPHA_NAME:
-                                node_found = create_node_links(
-                                    input_name=original_input.name,
-                                    node_group=passthrough,
-                                    original_input=original_input,
-                                    material=material
-                                )
-                                if original_input.name == 'Alpha' \
-                                and material.blend_method == 'OPAQUE' \
-                                and len(original_input.links):
-                                    material.blend_method = 'CLIP'
-                            elif name == Global.NORMAL_NODE \
-                            and original_input.name == "Normal":
-                                node_found = create_node_links(
-                                    input_name=original_input.name,
-                                    node_group=passthrough,
-                                    original_input=original_input,
-                                    material=material
-                                )
-                                if original_input.name == 'Alpha' \
-                                and gd.normals[0].use_texture \
-                                and material.blend_method == 'OPAQUE' \
-                                and len(original_input.links):
-                                    material.blend_method = 'CLIP'
-                                    
-                            elif name == Global.OCCLUSION_NODE \
-                            and original_input.name == "Normal":
-                                node_found = create_node_links(
-                                    input_name=original_input.name,
-                                    node_group=passthrough,
-                                    original_input=original_input,
-                                    material=material
-                                )   
-                            elif node_found:
-                                break
-                        if not node_found \
-                        and name != Global.NORMAL_NODE \
-                        and material.name != Global.GD_MATERIAL_NAME:
-                            operation_success = False
-
-                # NOTE: Remove all material output links and
-                # create new connection with main input
-                for link in output.inputs['Volume'].links:
-                    material.node_tree.links.remove(link)
-                for link in output.inputs['Displacement'].links:
-                    material.node_tree.links.remove(link)
-                material.node_tree.links.new(
-                    output.inputs["Surface"], passthrough.outputs["Shader"]
-                )
+        # Get output material node(s)
+        output_nodes = [
+            mat for mat in nodes if mat.type == 'OUTPUT_MATERIAL'
+        ]
+        if not output_nodes:
+            output = nodes.new('ShaderNodeOutputMaterial')
+            entry["nodes"].append(output.name)
+            output_nodes.append(output)
+        for output in output_nodes:
+            journal_output_links(entry, output)
+
+        for output in output_nodes:
+            passthrough = nodes.new('ShaderNodeGroup')
+            passthrough.node_tree = node_group
+            passthrough.location = (
+                output.location[0],
+                output.location[1] - 160
+            )
+            passthrough.name = node_group.name
+            passthrough.hide = True
+            entry["nodes"].append(passthrough.name)
+
+            GD_frame = nodes.new('NodeFrame')
+            GD_frame.location = (
+                output.location[0],
+                output.location[1] - 195
+            )
+            GD_frame.name = node_group.name
+            GD_frame.text = GD_text
+            GD_frame.width = 1000
+            GD_frame.height = 150
+            entry["nodes"].append(GD_frame.name)
+
+            # Link nodes
+            # TODO: This section needs to
+            # be seriously reconsidered
+            # inputs = get_material_output_inputs()
+            # if node_input.name in inputs:
+            #    for connection_name in inputs:
+            #        if node_input.name != connection_name:
+            #            continue
+            #        mat_slot.node_tree.links.new(
+            #            passthrough_ng.inputs[connection_name],
+            #            source_node.outputs[link.from_socket.name]
+            #        )
+            for output_material_input in output.inputs:
+                for link in output_material_input.links:
+                    source_node = nodes.get(link.from_node.name)
+
+                    # Store original output material connections
+                    try:
+                        material.node_tree.links.new(
+                            passthrough.inputs[output_material_input.name],
+                            source_node.outputs[link.from_socket.name]
+                        )
+                    except KeyError:
+                        pass
+
+
+                    #Link dependencies from any BSDF node
+                    if name not in Global.SHADER_MAP_NAMES \
+                    or "BSDF" not in source_node.type:
+                        continue
+                    
+                    node_found = link_bsdf_inputs(
+                        name, passthrough, source_node, material
+                    )
+                    if not node_found \
+                    and name != Global.NORMAL_NODE \
+                    and material.name != Global.GD_MATERIAL_NAME:
+                        operation_success = False
+
+            # NOTE: Remove all material output links and
+            # create new connection with main input
+            for link in output.inputs['Volume'].links:
+                material.node_tree.links.remove(link)
+            for link in output.inputs['Displacement'].links:
+                material.node_tree.links.remove(link)
+            material.node_tree.links.new(
+                output.inputs["Surface"], passthrough.outputs["Shader"]
+            )
     return operation_success
 
 
@@ -705,45 +1013,81 @@ def node_cleanup(setup_type: str) -> None:
     """Remove node group & return original links if they exist"""
     if setup_type is None:
         return
-    inputs = get_material_output_inputs()
-    for mat in bpy.data.materials:
-        mat.use_nodes = True
-        nodes = mat.node_tree.nodes
-        if mat.name == Global.GD_MATERIAL_NAME:
-            bpy.data.materials.remove(mat)
+    journal = material_journals.pop(setup_type, None)
+    if journal is None:
+        # NOTE: Setup applied in another session, e.g. a
+        # file saved during Map Preview, scan all materials
+        legacy_node_cleanup(setup_type)
+        return
+    inputs = None
+    created_materials = []
+    for material, entry in get_journaled_materials(journal):
+        if entry.get("created"):
+            created_materials.append(material)
             continue
-        if setup_type not in nodes:
+        if entry.get("legacy"):
+            if inputs is None:
+                inputs = get_material_output_inputs()
+            legacy_restore_material(material, setup_type, inputs)
             continue
+        restore_material(material, entry)
+    # NOTE: Only the fallback material, if it was created for this setup
+    for material in created_materials:
+        bpy.data.materials.remove(material)
 
-        grabdoc_nodes = [
-            mat for mat in nodes if mat.name.startswith(setup_type)
-        ]
-        for node in grabdoc_nodes:
-            output_node = None
-            for output in node.outputs:
-                for link in output.links:
-                    if link.to_node.type == 'OUTPUT_MATERIAL':
-                        output_node = link.to_node
-                        break
-                if output_node is not None:
+
+def legacy_node_cleanup(setup_type: str) -> None:
+    """Remove node group & return original links from
+    the node group inputs, visiting every material"""
+    inputs = get_material_output_inputs()
+    # NOTE: A fallback material still holding the setup was
+    # created alongside it, otherwise it's left untouched
+    gd_material = bpy.data.materials.get(Global.GD_MATERIAL_NAME)
+    if gd_material is not None and has_node_setup(gd_material, setup_type):
+        bpy.data.materials.remove(gd_material)
+    for mat in bpy.data.materials:
+        legacy_restore_material(mat, setup_type, inputs)
+
+
+def legacy_restore_material(
+        mat: Material, setup_type: str, inputs: dict
+    ) -> None:
+    """Remove a node setup & return original links
+    from the node group inputs of a single material"""
+    if not has_node_setup(mat, setup_type):
+        return
+    mat.use_nodes = True
+    nodes = mat.node_tree.nodes
+
+    grabdoc_nodes = [
+        mat for mat in nodes if mat.name.startswith(setup_type)
+    ]
+    for node in grabdoc_nodes:
+        output_node = None
+        for output in node.outputs:
+            for link in output.links:
+                if link.to_node.type == 'OUTPUT_MATERIAL':
+                    output_node = link.to_node
                     break
-            if output_node is None:
-                nodes.remove(node)
-                continue
+            if output_node is not None:
+                break
+        if output_node is None:
+            nodes.remove(node)
+            continue
 
-            for node_input in node.inputs:
-                for link in node_input.links:
-                    if node_input.name.split(' ')[-1] not in inputs:
+        for node_input in node.inputs:
+            for link in node_input.links:
+                if node_input.name.split(' ')[-1] not in inputs:
+                    continue
+                original_node_connection = nodes.get(link.from_node.name)
+                original_node_socket = link.from_socket.name
+                for connection_name in inputs:
+                    if node_input.name != connection_name:
                         continue
-                    original_node_connection = nodes.get(link.from_node.name)
-                    original_node_socket = link.from_socket.name
-                    for connection_name in inputs:
-                        if node_input.name != connection_name:
-                            continue
-                        mat.node_tree.links.new(
-                            output_node.inputs[connection_name],
-                            original_node_connection.outputs[
-                                original_node_socket
-                            ]
-                        )
-            nodes.remove(node)
+                    mat.node_tree.links.new(
+                        output_node.inputs[connection_name],
+                        original_node_connection.outputs[
+                            original_node_socket
+                        ]
+                    )
+        nodes.remove(node)
@@ -0,0 +1,202 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy
+import bpy
+from bpy.types import Context
+
+# NOTE: Bundled with Blender, but not guaranteed for custom builds
+try:
+    import OpenImageIO as oiio
+except ImportError:
+    oiio = None
+
+
+def is_streaming_pack_supported() -> bool:
+    return oiio is not None
+
+
+def pack_channels_streaming(
+        sources: dict[str, str],
+        layouts: list[tuple[str, list[tuple[str, int]]]],
+        chunk_rows: int=256,
+        png_compression: int | None=None
+    ) -> list[str]:
+    """Pack the first channel of each source file into the given
+    destination channels of one new file per layout, without image
+    datablocks. Sources map a bake map ID to its file path & layouts
+    pair an output path with (bake map ID, channel) items.
+
+    Files are streamed in chunks of scanlines in their native data
+    type with one reader thread per source. Each source is decoded
+    once and shared by every layout, so peak memory is bounded by
+    the chunk size rather than the resolution or layout count"""
+    inputs = {}
+    outputs = []
+    try:
+        for map_id, source_path in sources.items():
+            image_input = oiio.ImageInput.open(source_path)
+            if image_input is None:
+                raise OSError(oiio.geterror())
+            inputs[map_id] = image_input
+
+        spec = next(iter(inputs.values())).spec()
+        width, height = spec.width, spec.height
+        for image_input in inputs.values():
+            input_spec = image_input.spec()
+            if (input_spec.width, input_spec.height) != (width, height):
+                raise ValueError("Images must be same size")
+        color_space = spec.getattribute("oiio:ColorSpace")
+
+        for path, channels in layouts:
+            has_alpha = any(channel == 3 for _map_id, channel in channels)
+            channel_count = 4 if has_alpha else 3
+            out_spec = oiio.ImageSpec(
+                width, height, channel_count, spec.format
+            )
+            out_spec.channelnames = ("R", "G", "B", "A")[:channel_count]
+            out_spec.alpha_channel = 3 if has_alpha else -1
+            if color_space:
+                out_spec.attribute("oiio:ColorSpace", color_space)
+            if png_compression is not None:
+                out_spec.attribute("png:compressionLevel", png_compression)
+
+            output = oiio.ImageOutput.create(path)
+            if output is None or not output.open(path, out_spec):
+                raise OSError(oiio.geterror())
+            outputs.append((output, channel_count, channels))
+
+        def read_channel(image_input, ybegin: int, yend: int):
+            return image_input.read_scanlines(
+                0, 0, ybegin, yend, 0, 0, 1, spec.format
+            )
+
+        with ThreadPoolExecutor(max_workers=len(inputs)) as executor:
+            for ybegin in range(0, height, chunk_rows):
+                yend = min(ybegin + chunk_rows, height)
+                futures = {
+                    map_id: executor.submit(
+                        read_channel, image_input, ybegin, yend
+                    )
+                    for map_id, image_input in inputs.items()
+                }
+                pixels = {
+                    map_id: future.result().reshape(yend - ybegin, width, -1)
+                    for map_id, future in futures.items()
+                }
+                dtype = next(iter(pixels.values())).dtype
+                # NOTE: Channels without a source default to white
+                fill = numpy.iinfo(dtype).max if dtype.kind == 'u' else 1
+                for output, channel_count, channels in outputs:
+                    chunk = numpy.full(
+                        (yend - ybegin, width, channel_count), fill, dtype
+                    )
+                    for map_id, channel in channels:
+                        chunk[..., channel] = pixels[map_id][..., 0]
+                    output.write_scanlines(ybegin, yend, 0, chunk)
+        for output, _channel_count, _channels in outputs:
+            output.close()
+        outputs.clear()
+    finally:
+        for output, _channel_count, _channels in outputs:
+            output.close()
+        for image_input in inputs.values():
+            image_input.close()
+    return [path for path, _channels in layouts]
+
+
+def get_oiio_format(context: Context) -> str:
+    """Get the OpenImageIO data type matching the export format & depth"""
+    gd = context.scene.gd
+    if gd.format == 'OPEN_EXR':
+        return "half" if gd.exr_depth == '16' else "float"
+    if gd.format == 'TARGA':
+        return "uint8"
+    return "uint16" if gd.depth == '16' else "uint8"
+
+
+def get_png_compression(context: Context) -> int | None:
+    """Get the zlib level matching Blender's PNG compression percentage"""
+    gd = context.scene.gd
+    if gd.format != 'PNG':
+        return None
+    # NOTE: Same mapping as Blender's own PNG writer
+    return int(gd.png_compression / 11.1111)
+
+
+def get_oiio_attributes(context: Context) -> dict:
+    """Get the OpenImageIO output attributes matching the export settings"""
+    gd = context.scene.gd
+    attributes = {}
+    if gd.format == 'PNG':
+        attributes["png:compressionLevel"] = get_png_compression(context)
+    elif gd.format == 'OPEN_EXR':
+        attributes["compression"] = \
+            context.scene.render.image_settings.exr_codec.lower()
+    return attributes
+
+
+def write_pixels(
+        pixels: numpy.ndarray,
+        path: str,
+        oiio_format: str,
+        attributes: dict | None=None
+    ) -> str:
+    """Write a (height, width, channels) float array with rows
+    starting at the bottom through OpenImageIO. The GIL is
+    released while encoding, so this is safe to run in threads"""
+    height, width, channels = pixels.shape
+    spec = oiio.ImageSpec(width, height, channels, oiio_format)
+    spec.channelnames = ("R", "G", "B", "A")[:channels]
+    spec.alpha_channel = 3 if channels == 4 else -1
+    for name, value in (attributes or {}).items():
+        spec.attribute(name, value)
+    output = oiio.ImageOutput.create(path)
+    if output is None or not output.open(path, spec):
+        raise OSError(oiio.geterror())
+    # NOTE: Buffer rows start at the bottom, image rows at the top
+    output.write_image(numpy.ascontiguousarray(pixels[::-1]))
+    output.close()
+    return path
+
+
+def pack_buffers(
+        context: Context,
+        buffers: list[tuple[numpy.ndarray, int]],
+        path: str
+    ) -> str:
+    """Pack the first channel of in-memory render buffers into the given
+    destination channels and write the result without re-reading files"""
+    gd = context.scene.gd
+    height, width = buffers[0][0].shape[:2]
+    has_alpha = any(channel == 3 for _pixels, channel in buffers)
+    for pixels, _channel in buffers:
+        if pixels.shape[:2] != (height, width):
+            raise ValueError("Images must be same size")
+
+    packed = numpy.ones((height, width, 4), dtype=numpy.float32)
+    for pixels, channel in buffers:
+        packed[..., channel] = pixels[..., 0]
+
+    if oiio is not None:
+        channels = 4 if has_alpha else 3
+        return write_pixels(
+            packed[..., :channels],
+            path,
+            get_oiio_format(context),
+            get_oiio_attributes(context)
+        )
+
+    image = bpy.data.images.new(
+        os.path.splitext(os.path.basename(path))[0],
+        width,
+        height,
+        alpha=has_alpha,
+        float_buffer=gd.format == 'OPEN_EXR'
+    )
+    image.pixels.foreach_set(packed.ravel())
+    image.filepath_raw = path
+    image.file_format = gd.format
+    image.save()
+    bpy.data.images.remove(image)
+    return path
@@ -1,8 +1,8 @@
-
-from mathutils import Vector
+import numpy
 
 import bpy
-from bpy.types import Object
+from bpy.app.handlers import persistent
+from bpy.types import Object, Collection, Scene, Depsgraph
 
 from ..constants import Global
 
@@ -32,41 +32,42 @@ def is_valid_gd_object(
     return True
 
 
-def in_viewing_frustrum(vector: Vector) -> bool:
-    """Decide whether a given object is
-    within the cameras viewing frustrum"""
+def get_viewing_frustrum_bounds() -> numpy.ndarray:
+    """Get the world space min & max corners of the box
+    around the cameras viewing frustrum as a (2, 3) array"""
     bg_plane = bpy.data.objects[Global.BG_PLANE_NAME]
-    viewing_frustrum = (
-        Vector
-        (
-            (
-                bg_plane.dimensions.x * -1.25 + bg_plane.location[0],
-                bg_plane.dimensions.y * -1.25 + bg_plane.location[1],
-                -100
-            )
-        ),
-        Vector(
-            (
-                bg_plane.dimensions.x * 1.25 + bg_plane.location[0],
-                bg_plane.dimensions.y * 1.25 + bg_plane.location[1],
-                100
-            )
-        )
+    location = numpy.array(bg_plane.location)
+    extent = numpy.array(
+        (bg_plane.dimensions.x * 1.25, bg_plane.dimensions.y * 1.25, 0)
     )
-    for i in range(0, 3):
-        if (
-            vector[i]     < viewing_frustrum[0][i] \
-            and vector[i] < viewing_frustrum[1][i] \
-            or vector[i]  > viewing_frustrum[0][i] \
-            and vector[i] > viewing_frustrum[1][i]
-        ):
-            return False
-    return True
+    bounds = numpy.array((location - extent, location + extent))
+    bounds[:, 2] = (-100, 100)
+    return numpy.sort(bounds, axis=0)
+
 
+def cull_to_frustrum(bound_boxes: list, matrices: list) -> numpy.ndarray:
+    """Batched overlap test of local bounding boxes transformed by
+    their world matrices against the viewing frustrum box.
+
+    Returns a boolean mask of the boxes that overlap it"""
+    if not bound_boxes:
+        return numpy.zeros(0, dtype=bool)
+    boxes = numpy.array(bound_boxes, dtype=numpy.float64)  # (N, 8, 3)
+    matrices = numpy.array(matrices, dtype=numpy.float64)  # (N, 4, 4)
+    corners = numpy.einsum('nij,nkj->nki', matrices[:, :3, :3], boxes) \
+        + matrices[:, None, :3, 3]
+    box_min = corners.min(axis=1)
+    box_max = corners.max(axis=1)
+    frustrum_min, frustrum_max = get_viewing_frustrum_bounds()
+    return numpy.all(
+        (box_max >= frustrum_min) & (box_min <= frustrum_max), axis=1
+    )
 
-def get_rendered_objects() -> set | None:
+
+def find_rendered_objects() -> set:
     """Generate a list of all objects that will be rendered
-    based on its origin position in world space"""
+    based on their bounding box position in world space,
+    including objects instanced by collections & geometry nodes"""
     objects = set()
     if bpy.context.scene.gd.use_bake_collections:
         for coll in bpy.data.collections:
@@ -81,59 +82,225 @@ def get_rendered_objects() -> set | None:
             #        rendered_obs.add(ob.name)
         return objects
 
-    for ob in bpy.context.view_layer.objects:
-        if not is_valid_gd_object(ob):
-            continue
-
-        local_bbox_center = .125 * sum(
-            (Vector(ob) for ob in ob.bound_box), Vector()
+    # NOTE: Objects & instances in a single pass. Instance
+    # sources are often hidden, so only the type & GrabDoc
+    # object checks apply to them, their instancer has to render
+    candidates = []
+    bound_boxes = []
+    matrices = []
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    for instance in depsgraph.object_instances:
+        if instance.is_instance:
+            if instance.parent.original.hide_render:
+                continue
+            ob = instance.instance_object.original
+            if ob is None or ob.name not in bpy.data.objects:
+                # NOTE: Geometry node instances of raw geometry
+                ob = instance.parent.original
+            if not is_valid_gd_object(ob, render_visible=False):
+                continue
+        else:
+            ob = instance.object.original
+            if not is_valid_gd_object(ob):
+                continue
+        candidates.append(ob)
+        # NOTE: Instance data is only valid during iteration
+        bound_boxes.append(
+            [tuple(corner) for corner in instance.object.bound_box]
         )
-        global_bbox_center = ob.matrix_world @ local_bbox_center
-        if in_viewing_frustrum(global_bbox_center):
-            objects.add(ob)
+        matrices.append(instance.matrix_world.copy())
+
+    visible = cull_to_frustrum(bound_boxes, matrices)
+    objects.update(
+        ob for ob, is_visible in zip(candidates, visible) if is_visible
+    )
     return objects
 
 
+################################################
+# RENDERED OBJECT CACHE
+################################################
+
+
+# NOTE: Rendered objects & their height per cache key,
+# reset by `rendered_objects_update`
+rendered_cache: dict[tuple, dict] = {}
+rendered_visibility: dict[str, bool] = {}
+
+
+def clear_rendered_cache() -> None:
+    rendered_cache.clear()
+    rendered_visibility.clear()
+
+
+def get_rendered_cache_key() -> tuple:
+    """Settings the rendered objects depend on besides the
+    objects themselves, e.g. the BG plane scaled up for export"""
+    context = bpy.context
+    plane = None
+    bg_plane = bpy.data.objects.get(Global.BG_PLANE_NAME)
+    if bg_plane is not None:
+        plane = (*bg_plane.location, *bg_plane.dimensions)
+    return (
+        context.scene.name,
+        context.view_layer.name,
+        context.scene.gd.use_bake_collections,
+        plane
+    )
+
+
+def get_rendered_objects() -> set:
+    """Get all objects that will be rendered, cached
+    until a relevant depsgraph update happens"""
+    key = get_rendered_cache_key()
+    if key not in rendered_cache:
+        objects = find_rendered_objects()
+        # NOTE: Every lookup, as each key can see other objects
+        rendered_visibility.update(
+            (ob.name, ob.hide_render)
+            for ob in (*bpy.context.view_layer.objects, *objects)
+        )
+        rendered_cache[key] = {"objects": objects, "height": None}
+    return set(rendered_cache[key]["objects"])
+
+
+def get_rendered_height() -> float:
+    """Get the cached height of the tallest rendered object"""
+    objects = get_rendered_objects()
+    entry = rendered_cache[get_rendered_cache_key()]
+    if entry["height"] is None:
+        entry["height"] = find_tallest_object(objects)
+    return entry["height"]
+
+
+@persistent
+def rendered_objects_update(_scene: Scene, depsgraph: Depsgraph) -> None:
+    """Invalidate the rendered object cache on transform,
+    geometry, visibility or collection changes"""
+    if not rendered_cache:
+        return
+    for update in depsgraph.updates:
+        if isinstance(update.id, Collection):
+            clear_rendered_cache()
+            return
+        if not isinstance(update.id, Object):
+            continue
+        ob = update.id.original
+        # NOTE: GrabDoc objects are part of the cache key
+        if ob.gd_object:
+            continue
+        if update.is_updated_transform \
+        or update.is_updated_geometry \
+        or rendered_visibility.get(ob.name) != ob.hide_render:
+            clear_rendered_cache()
+            return
+
+
+@persistent
+def rendered_objects_reset(*_args) -> None:
+    """Object references are invalid after loading files or undo"""
+    clear_rendered_cache()
+
+
 def set_guide_height(objects: list[Object]=None) -> None:
     """Set guide height maximum property value
-    based on a given list of objects"""
-    tallest_vert = find_tallest_object(objects)
+    based on a given list of objects, or the
+    cached rendered objects if not given"""
+    if objects is None:
+        tallest_vert = get_rendered_height()
+    else:
+        tallest_vert = find_tallest_object(objects)
     bg_plane = bpy.data.objects.get(Global.BG_PLANE_NAME)
     bpy.context.scene.gd.height[0].distance = \
         tallest_vert - bg_plane.location[2]
 
 
+def get_bbox_max_z(ob: Object) -> float:
+    """Get the highest world space Z value of an object's bounding box"""
+    corners = numpy.array(ob.bound_box, dtype=numpy.float64)
+    matrix = numpy.array(ob.matrix_world, dtype=numpy.float64)
+    return float((corners @ matrix[2, :3] + matrix[2, 3]).max())
+
+
+def get_mesh_max_z(ob_eval: Object) -> float | None:
+    """Get the highest world space Z value of an evaluated object's vertices"""
+    try:
+        mesh_eval = ob_eval.to_mesh()
+    except RuntimeError:
+        # NOTE: Object can't be evaluates as mesh; maybe particle system
+        return None
+    if mesh_eval is None:
+        return None
+    try:
+        vert_count = len(mesh_eval.vertices)
+        if not vert_count:
+            return None
+        co = numpy.empty(vert_count * 3, dtype=numpy.float32)
+        mesh_eval.vertices.foreach_get("co", co)
+        co = co.reshape(vert_count, 3)
+
+        # NOTE: Only the Z row of the world matrix is needed
+        matrix = numpy.array(ob_eval.matrix_world, dtype=numpy.float32)
+        return float((co @ matrix[2, :3]).max() + matrix[2, 3])
+    finally:
+        ob_eval.to_mesh_clear()
+
+
 def find_tallest_object(objects: list[Object]=None) -> float:
     """Find the tallest points in the viewlayer by looping
-    through objects to find the highest vertex on the Z axis"""
+    through objects to find the highest vertex on the Z axis
+
+    Objects are visited from the highest bounding box down,
+    stopping once no bounding box can contain a higher vertex"""
     if objects is None:
         objects = bpy.context.selectable_objects
 
     depsgraph = bpy.context.evaluated_depsgraph_get()
-    tallest_verts = []
-    objects = [
-        ob for ob in objects if not ob.name.startswith(Global.PREFIX)
-    ]
+    candidates = []
     for ob in objects:
-        ob_eval = ob.evaluated_get(depsgraph)
-        try:
-            mesh_eval = ob_eval.to_mesh()
-        except RuntimeError:
-            # NOTE: Object can't be evaluates as mesh; maybe particle system
+        if ob.name.startswith(Global.PREFIX):
             continue
+        ob_eval = ob.evaluated_get(depsgraph)
+        candidates.append((get_bbox_max_z(ob_eval), ob_eval))
+    candidates.sort(key=lambda candidate: candidate[0], reverse=True)
 
-        global_vert_co = [
-            ob_eval.matrix_world @ v.co for v in mesh_eval.vertices
-        ]
-
-        # NOTE: Find highest Z-value amongst
-        # object's vertices and append to list
-        if len(global_vert_co):
-            max_z_co = max(co.z for co in global_vert_co)
-            tallest_verts.append(max_z_co)
-        ob_eval.to_mesh_clear()
-    if not tallest_verts:
+    tallest_vert = None
+    for bbox_max_z, ob_eval in candidates:
+        if tallest_vert is not None and bbox_max_z <= tallest_vert:
+            break
+        max_z = get_mesh_max_z(ob_eval)
+        if max_z is None:
+            continue
+        if tallest_vert is None or max_z > tallest_vert:
+            tallest_vert = max_z
+    if tallest_vert is None:
         bpy.context.scene.gd.height[0].method = 'MANUAL'
         # NOTE: Fallback to manual height value
         return bpy.context.scene.gd.height[0].distance
-    return max(tallest_verts)
+    return tallest_vert
+
+
+################################################
+# REGISTRATION
+################################################
+
+
+reset_handlers = (
+    bpy.app.handlers.load_post,
+    bpy.app.handlers.undo_post,
+    bpy.app.handlers.redo_post
+)
+
+
+def register():
+    bpy.app.handlers.depsgraph_update_post.append(rendered_objects_update)
+    for handlers in reset_handlers:
+        handlers.append(rendered_objects_reset)
+
+def unregister():
+    if rendered_objects_update in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(rendered_objects_update)
+    for handlers in reset_handlers:
+        if rendered_objects_reset in handlers:
+            handlers.remove(rendered_objects_reset)
+    clear_rendered_cache()
@@ -1,12 +1,26 @@
+import math
+
 import bpy
 import bmesh
-from bpy.types import Context, Object
+from bpy.types import Context, Object, Mesh, Scene, Collection
 
 from ..constants import Global
-from ..utils.generic import is_camera_in_3d_view
+from ..utils.generic import (
+    is_camera_in_3d_view,
+    set_if_changed,
+    suspendable
+)
 from ..utils.node import node_init
 
 
+# NOTE: Settings the background plane mesh was last built from
+PLANE_SIGNATURE_NAME = "gd_plane_signature"
+
+# Seconds without changes before a debounced update runs
+DEBOUNCE_INTERVAL = .25
+debounce_scene: str | None = None
+
+
 def remove_setup(context: Context, hard_reset: bool=True) -> None | list:
     """Completely removes every element of GrabDoc from
     the scene, not including images reimported after bakes
@@ -183,29 +197,13 @@ def scene_setup(_self, context: Context) -> None:
         view_layer.layer_collection.children[gd_coll.name]
 
     # BG PLANE
-    bpy.ops.mesh.primitive_plane_add(
-        size=gd.scale,
-        calc_uvs=True,
-        align='WORLD',
-        location=saved_plane_loc,
-        rotation=saved_plane_rot
-    )
-
-    # Rename newly made BG Plane & set a reference to it
-    context.object.name = context.object.data.name = Global.BG_PLANE_NAME
-    plane_ob = bpy.data.objects[Global.BG_PLANE_NAME]
-
-    # Plane scaling
-    if gd.resolution_x != gd.resolution_y:
-        if gd.resolution_x > gd.resolution_y:
-            div_factor = gd.resolution_x / gd.resolution_y
-            plane_ob.scale[1] /= div_factor
-        else:
-            div_factor = gd.resolution_y / gd.resolution_x
-            plane_ob.scale[0] /= div_factor
-        bpy.ops.object.transform_apply(location=False, rotation=False)
+    plane_data = bpy.data.meshes.new(Global.BG_PLANE_NAME)
+    update_plane_mesh(plane_data, gd)
+    plane_ob = bpy.data.objects.new(Global.BG_PLANE_NAME, plane_data)
+    plane_ob.location = saved_plane_loc
+    plane_ob.rotation_euler = saved_plane_rot
+    gd_coll.objects.link(plane_ob)
 
-    plane_ob.select_set(False)
     # NOTE: Skip enabling gd_object
     # as we always want it to render
     #plane_ob.gd_object = True
@@ -214,74 +212,20 @@ def scene_setup(_self, context: Context) -> None:
     plane_ob.lock_scale[1] = \
     plane_ob.lock_scale[2] = True
 
-    # Add reference to the plane if one has been added
-    # else find and remove any existing reference materials
-    if gd.reference and not gd.preview_state:
-        for mat in bpy.data.materials:
-            if mat.name == Global.REFERENCE_NAME:
-                mat.node_tree.nodes.get('Image Texture').image = gd.reference
-                break
-        else:
-            # Create a new material & turn on node use
-            mat = bpy.data.materials.new(Global.REFERENCE_NAME)
-            mat.use_nodes = True
-
-            # Get / load nodes
-            output = mat.node_tree.nodes['Material Output']
-            output.location = (0,0)
-            mat.node_tree.nodes.remove(
-                mat.node_tree.nodes['Principled BSDF']
-            )
-
-            image = mat.node_tree.nodes.new('ShaderNodeTexImage')
-            image.image = gd.reference
-            image.location = (-300,0)
-
-            mat.node_tree.links.new(
-                output.inputs["Surface"],
-                image.outputs["Color"]
-            )
-
-        plane_ob.active_material = bpy.data.materials[Global.REFERENCE_NAME]
-
-        for area in context.screen.areas:
-            if area.type != 'VIEW_3D':
-                continue
-            for space in area.spaces:
-                space.shading.color_type = 'TEXTURE'
-    else:
-        # Refresh original material and delete the reference material
-        if saved_mat is not None:
-            plane_ob.active_material = saved_mat
-        # TODO: Removal operation inside of a setup function
-        if Global.REFERENCE_NAME in bpy.data.materials:
-            bpy.data.materials.remove(
-                bpy.data.materials[Global.REFERENCE_NAME]
-            )
-
-    # Grid for better snapping and measurements
-    if gd.use_grid and gd.grid_subdivs:
-        bm = bmesh.new()
-        bm.from_mesh(plane_ob.data)
-        bmesh.ops.subdivide_edges(
-            bm,
-            edges=bm.edges,
-            cuts=gd.grid_subdivs,
-            use_grid_fill=True
-        )
-        bm.to_mesh(plane_ob.data)
+    # Refresh original material, replaced by the reference if one is set
+    if saved_mat is not None:
+        plane_ob.active_material = saved_mat
+    update_reference(context, plane_ob)
 
     # CAMERA
     camera_data = bpy.data.cameras.new(Global.TRIM_CAMERA_NAME)
     camera_data.type = 'ORTHO'
     camera_data.display_size = .01
     camera_data.passepartout_alpha = 1
-    camera_data.ortho_scale = gd.scale
     camera_data.clip_start = 0.1
-    camera_data.clip_end = 1000 * (gd.scale / 25)
 
     camera_ob = bpy.data.objects.new(Global.TRIM_CAMERA_NAME, camera_data)
-    camera_ob.location = (0, 0, 15 * gd.scale)
+    update_camera(camera_ob, gd)
     camera_ob.parent = plane_ob
     camera_ob.gd_object = True
     # TODO: This causes visual errors when in camera view?
@@ -317,41 +261,269 @@ def scene_setup(_self, context: Context) -> None:
         pass
 
     # NOTE: Reset collection visibility, run this after everything else
-    gd_coll.hide_select = not gd.coll_selectable
-    gd_coll.hide_viewport = not gd.coll_visible
-    gd_coll.hide_render = not gd.coll_rendered
+    update_collection_flags(gd_coll, gd)
+
+
+def is_scene_updatable(context: Context) -> bool:
+    """Check that every data-block edited in place by
+    `scene_update` exists and matches the current settings"""
+    data_checks = (
+        Global.COLL_NAME in bpy.data.collections,
+        Global.BG_PLANE_NAME in bpy.data.objects,
+        Global.TRIM_CAMERA_NAME in bpy.data.objects,
+        Global.ORIENT_GUIDE_NAME in bpy.data.objects,
+        context.scene.gd.use_bake_collections \
+            == (Global.COLL_OB_NAME in bpy.data.collections)
+    )
+    return all(data_checks)
 
 
-def generate_height_guide(name: str, plane_ob: Object) -> None:
-    """Generate a mesh object that gauges the height map range.
-    This is for the "Manual" height map mode and can better
-    inform a correct 0-1 range"""
-    scene = bpy.context.scene
-    camera_view_frame = \
-        bpy.data.objects[Global.TRIM_CAMERA_NAME].data.view_frame(
-            scene=scene
+# NOTE: Needs self for property update functions to register
+@suspendable
+def scene_update(_self, context: Context) -> None:
+    """Apply setup related property changes to the existing GrabDoc
+    data-blocks, only writing what differs. Falls back to a full
+    `scene_setup` rebuild if the setup is missing or incomplete"""
+    if not is_scene_updatable(context):
+        scene_setup(_self, context)
+        return
+
+    scene = context.scene
+    gd = scene.gd
+    set_if_changed(scene.render, "resolution_x", gd.resolution_x)
+    set_if_changed(scene.render, "resolution_y", gd.resolution_y)
+
+    plane_ob = bpy.data.objects[Global.BG_PLANE_NAME]
+    if update_plane_mesh(plane_ob.data, gd):
+        set_mesh_geometry(
+            bpy.data.objects[Global.ORIENT_GUIDE_NAME].data,
+            *get_orientation_guide_geometry(gd)
         )
+    update_reference(context, plane_ob)
 
-    stems_vecs = [
-        (v[0], v[1], scene.gd.height[0].distance) for v in camera_view_frame
-    ]
-    ring_vecs = [
-        (v[0], v[1], v[2]+1) for v in camera_view_frame
+    camera_ob = bpy.data.objects[Global.TRIM_CAMERA_NAME]
+    update_camera(camera_ob, gd)
+    set_if_changed(scene, "camera", camera_ob)
+
+    height_guide = bpy.data.objects.get(Global.HEIGHT_GUIDE_NAME)
+    if gd.height[0].enabled and gd.height[0].method == 'MANUAL':
+        if height_guide is None:
+            generate_height_guide(Global.HEIGHT_GUIDE_NAME, plane_ob)
+        else:
+            set_mesh_geometry(
+                height_guide.data, *get_height_guide_geometry(scene)
+            )
+    elif height_guide is not None:
+        bpy.data.meshes.remove(height_guide.data)
+
+    update_collection_flags(bpy.data.collections[Global.COLL_NAME], gd)
+
+
+@suspendable
+def scene_update_debounced(_self, context: Context) -> None:
+    """Coalesce slider drags into a single `scene_update`, run once
+    the value stops changing. The camera & plane scale are updated
+    immediately as a cheap visual proxy in the meantime"""
+    global debounce_scene
+    # NOTE: Timers never run without the UI event loop
+    if bpy.app.background or not is_scene_updatable(context):
+        scene_update(_self, context)
+        return
+    debounce_scene = context.scene.name
+
+    gd = context.scene.gd
+    plane_ob = bpy.data.objects[Global.BG_PLANE_NAME]
+    signature = plane_ob.data.get(PLANE_SIGNATURE_NAME)
+    if signature is not None:
+        set_proxy_scale(plane_ob, gd.scale / signature[0])
+    update_camera(bpy.data.objects[Global.TRIM_CAMERA_NAME], gd)
+
+    # NOTE: Re-registering restarts the delay
+    if bpy.app.timers.is_registered(flush_scene_update):
+        bpy.app.timers.unregister(flush_scene_update)
+    bpy.app.timers.register(
+        flush_scene_update, first_interval=DEBOUNCE_INTERVAL
+    )
+
+
+def flush_scene_update() -> None:
+    """Timer callback applying the last debounced scene update"""
+    global debounce_scene
+    scene = bpy.data.scenes.get(debounce_scene or "")
+    debounce_scene = None
+    if scene is None or not bpy.context.window_manager.windows:
+        return None
+
+    # NOTE: Timers run without a window in the context
+    window = bpy.context.window_manager.windows[0]
+    with bpy.context.temp_override(window=window, scene=scene):
+        if not is_scene_updatable(bpy.context):
+            scene_setup(None, bpy.context)
+            return None
+        set_proxy_scale(bpy.data.objects[Global.BG_PLANE_NAME], 1)
+        scene_update(None, bpy.context)
+    return None
+
+
+def set_proxy_scale(plane_ob: Object, scale: float) -> None:
+    """Scale the background plane as a preview of its rebuilt mesh,
+    counter-scaling the children so the camera & guides keep their size"""
+    set_if_changed(plane_ob.scale, "x", scale)
+    set_if_changed(plane_ob.scale, "y", scale)
+    for child in plane_ob.children:
+        set_if_changed(child.scale, "x", 1 / scale)
+        set_if_changed(child.scale, "y", 1 / scale)
+
+
+def flush_pending_scene_update() -> None:
+    """Apply a debounced update now, e.g. before rendering"""
+    if not bpy.app.timers.is_registered(flush_scene_update):
+        return
+    bpy.app.timers.unregister(flush_scene_update)
+    flush_scene_update()
+
+
+def get_plane_size(gd) -> tuple[float, float]:
+    """Get the background plane width & height, fitting
+    the scale to the longest side of the resolution"""
+    if gd.resolution_x > gd.resolution_y:
+        return gd.scale, gd.scale * gd.resolution_y / gd.resolution_x
+    return gd.scale * gd.resolution_x / gd.resolution_y, gd.scale
+
+
+def update_plane_mesh(mesh: Mesh, gd) -> bool:
+    """Rebuild the background plane geometry in place if the settings
+    it was built from changed. Returns True if it was rebuilt"""
+    signature = [
+        float(gd.scale),
+        float(gd.resolution_x),
+        float(gd.resolution_y),
+        float(gd.grid_subdivs if gd.use_grid else 0)
     ]
-    ring_vecs += stems_vecs
+    if list(mesh.get(PLANE_SIGNATURE_NAME, ())) == signature:
+        return False
+
+    width, height = get_plane_size(gd)
+    bm = bmesh.new()
+    uv_layer = bm.loops.layers.uv.new("UVMap")
+    face = bm.faces.new([
+        bm.verts.new((x * width / 2, y * height / 2, 0))
+        for x, y in ((-1, -1), (1, -1), (1, 1), (-1, 1))
+    ])
+    for loop in face.loops:
+        loop[uv_layer].uv = (
+            loop.vert.co.x / width + .5, loop.vert.co.y / height + .5
+        )
+
+    # Grid for better snapping and measurements
+    if gd.use_grid and gd.grid_subdivs:
+        bmesh.ops.subdivide_edges(
+            bm,
+            edges=bm.edges,
+            cuts=gd.grid_subdivs,
+            use_grid_fill=True
+        )
+    bm.to_mesh(mesh)
+    bm.free()
+    mesh.update()
+    mesh[PLANE_SIGNATURE_NAME] = signature
+    return True
+
+
+def update_camera(camera_ob: Object, gd) -> None:
+    camera_data = camera_ob.data
+    set_if_changed(camera_data, "ortho_scale", gd.scale)
+    set_if_changed(camera_data, "clip_end", 1000 * (gd.scale / 25))
+    set_if_changed(camera_ob.location, "z", get_camera_height(gd))
+
+
+def get_camera_height(gd) -> float:
+    return 15 * gd.scale
+
+
+def update_collection_flags(gd_coll: Collection, gd) -> None:
+    set_if_changed(gd_coll, "hide_select", not gd.coll_selectable)
+    set_if_changed(gd_coll, "hide_viewport", not gd.coll_visible)
+    set_if_changed(gd_coll, "hide_render", not gd.coll_rendered)
+
+
+def update_reference(context: Context, plane_ob: Object) -> None:
+    """Add reference to the plane if one has been added
+    else find and remove any existing reference materials"""
+    gd = context.scene.gd
+    if not gd.reference or gd.preview_state:
+        # TODO: Removal operation inside of a setup function
+        if Global.REFERENCE_NAME in bpy.data.materials:
+            bpy.data.materials.remove(
+                bpy.data.materials[Global.REFERENCE_NAME]
+            )
+        return
+
+    mat = bpy.data.materials.get(Global.REFERENCE_NAME)
+    if mat is not None:
+        image = mat.node_tree.nodes.get('Image Texture')
+        set_if_changed(image, "image", gd.reference)
+    else:
+        # Create a new material & turn on node use
+        mat = bpy.data.materials.new(Global.REFERENCE_NAME)
+        mat.use_nodes = True
+
+        # Get / load nodes
+        output = mat.node_tree.nodes['Material Output']
+        output.location = (0,0)
+        mat.node_tree.nodes.remove(
+            mat.node_tree.nodes['Principled BSDF']
+        )
 
+        image = mat.node_tree.nodes.new('ShaderNodeTexImage')
+        image.image = gd.reference
+        image.location = (-300,0)
+
+        mat.node_tree.links.new(
+            output.inputs["Surface"],
+            image.outputs["Color"]
+        )
+    if plane_ob.active_material != mat:
+        plane_ob.active_material = mat
+
+    for area in context.screen.areas:
+        if area.type != 'VIEW_3D':
+            continue
+        for space in area.spaces:
+            if space.type == 'VIEW_3D':
+                set_if_changed(space.shading, "color_type", 'TEXTURE')
+
+
+def set_mesh_geometry(
+        mesh: Mesh, vertices: list[tuple], edges: list[tuple]
+    ) -> bool:
+    """Replace the vertices & edges of a guide mesh if they differ"""
+    current = [tuple(vert.co) for vert in mesh.vertices]
+    if len(current) == len(vertices) and all(
+        math.isclose(a, b, abs_tol=1e-6)
+        for co, new_co in zip(current, vertices)
+        for a, b in zip(co, new_co)
+    ):
+        return False
+    mesh.clear_geometry()
+    mesh.from_pydata(vertices=vertices, edges=edges, faces=[])
+    mesh.update()
+    return True
+
+
+def generate_height_guide(name: str, plane_ob: Object) -> None:
+    """Generate a mesh object that gauges the height map range.
+    This is for the "Manual" height map mode and can better
+    inform a correct 0-1 range"""
     mesh = bpy.data.meshes.new(name)
     ob = bpy.data.objects.new(name, mesh)
 
     # Create mesh from list of vertices / edges / faces
-    mesh.from_pydata(
-        vertices=ring_vecs,
-        edges=[(0,4), (1,5), (2,6), (3,7), (4,5), (5,6), (6,7), (7,4)],
-        faces=[]
-    )
+    vertices, edges = get_height_guide_geometry(bpy.context.scene)
+    mesh.from_pydata(vertices=vertices, edges=edges, faces=[])
     mesh.update()
 
-    bpy.context.collection.objects.link(ob)
+    bpy.data.collections[Global.COLL_NAME].objects.link(ob)
     ob.gd_object = True
     ob.parent = plane_ob # NOTE: BG Plane
     ob.hide_select = True
@@ -366,17 +538,36 @@ def generate_orientation_guide(
     ob = bpy.data.objects.new(name, mesh)
 
     # Create mesh from list of vertices / edges / faces
-    plane_y = plane_ob.dimensions.y / 2
-    mesh.from_pydata(
-        vertices=[
-            (-.3, plane_y+.1, 0), (.3, plane_y+.1, 0), (0, plane_y+.35, 0)
-        ],
-        edges=[(0,2), (0,1), (1,2)],
-        faces=[]
-    )
+    vertices, edges = get_orientation_guide_geometry(bpy.context.scene.gd)
+    mesh.from_pydata(vertices=vertices, edges=edges, faces=[])
     mesh.update()
 
-    bpy.context.collection.objects.link(ob)
+    bpy.data.collections[Global.COLL_NAME].objects.link(ob)
     ob.parent = plane_ob # NOTE: BG Plane
     ob.hide_select = True
     ob.gd_object = True
+
+
+def get_height_guide_geometry(scene: Scene) -> tuple[list, list]:
+    camera_view_frame = \
+        bpy.data.objects[Global.TRIM_CAMERA_NAME].data.view_frame(
+            scene=scene
+        )
+
+    stems_vecs = [
+        (v[0], v[1], scene.gd.height[0].distance) for v in camera_view_frame
+    ]
+    ring_vecs = [
+        (v[0], v[1], v[2]+1) for v in camera_view_frame
+    ]
+    ring_vecs += stems_vecs
+    edges = [(0,4), (1,5), (2,6), (3,7), (4,5), (5,6), (6,7), (7,4)]
+    return ring_vecs, edges
+
+
+def get_orientation_guide_geometry(gd) -> tuple[list, list]:
+    plane_y = get_plane_size(gd)[1] / 2
+    vertices = [
+        (-.3, plane_y+.1, 0), (.3, plane_y+.1, 0), (0, plane_y+.35, 0)
+    ]
+    return vertices, [(0,2), (0,1), (1,2)]
@@ -0,0 +1,191 @@
+import bpy
+from bpy.app.handlers import persistent
+from bpy.types import Context, Object
+
+from ..constants import Global
+from .baker import Baker, baker_init, baker_cleanup
+from .node import apply_node_to_objects, node_cleanup
+from .switch import apply_switch_to_objects, set_switch_map
+from .trace import span
+
+
+# NOTE: Settings applied once by `baker_init`, a
+# session is restarted if any of them changed
+SESSION_SETTINGS = (
+    "resolution_x",
+    "resolution_y",
+    "format",
+    "depth",
+    "exr_depth",
+    "png_compression",
+    "filter_width",
+    "coll_rendered",
+    "coll_visible"
+)
+
+
+class BakeSession():
+    """Scene state shared by previews, single renders & exports.
+
+    The scene is put into a bake-ready state once, switching maps
+    only swaps the bake map setup & node group of the previous map.
+    The original state is restored once, when the last holder releases
+    the session, so nothing outlives the operators using it"""
+
+    def __init__(self, context: Context):
+        self.scene_name = context.scene.name
+        self.settings_key = get_settings_key(context)
+        self.users = 0
+        self.is_interrupted = False
+        self.baker = None
+        self.node = None
+        self.use_switch = False
+        with span("baker_init"):
+            baker_init(self, context)
+
+    def set_map(
+            self,
+            baker: Baker,
+            objects: set[Object],
+            use_switch: bool=False,
+            material_index: tuple | None=None
+        ) -> bool:
+        """Swap the previous bake map setup & node group for the given
+        map. Returns False if any material slots couldn't be linked"""
+        result = True
+        if self.baker is not None:
+            with span("Baker.cleanup", map=self.baker.ID):
+                self.baker.cleanup()
+        self.baker = baker
+        with span("Baker.setup", map=baker.ID):
+            baker.setup()
+
+        if use_switch:
+            if not self.use_switch:
+                self.release_node()
+                with span("apply_switch_to_objects"):
+                    result = apply_switch_to_objects(objects)
+                self.use_switch = True
+            if baker.NODE:
+                set_switch_map(baker.NODE)
+            return result
+
+        if self.use_switch or self.node != baker.NODE:
+            self.release_node()
+        if baker.NODE and self.node is None:
+            with span("apply_node_to_objects", map=baker.ID):
+                result = apply_node_to_objects(
+                    baker.NODE, objects, material_index
+                )
+            self.node = baker.NODE
+        return result
+
+    def release_node(self) -> None:
+        if self.use_switch:
+            with span("node_cleanup"):
+                node_cleanup(Global.SWITCH_NODE)
+        elif self.node is not None:
+            with span("node_cleanup"):
+                node_cleanup(self.node)
+        self.node = None
+        self.use_switch = False
+
+    def release_map(self) -> None:
+        """Revert the active bake map setup & node group"""
+        if self.baker is not None:
+            with span("Baker.cleanup", map=self.baker.ID):
+                self.baker.cleanup()
+        self.baker = None
+        self.release_node()
+
+    def end(self, context: Context) -> None:
+        self.release_map()
+        scene = bpy.data.scenes.get(self.scene_name)
+        if scene is None:
+            return
+        if context.scene != scene:
+            with context.temp_override(scene=scene):
+                baker_cleanup(self, bpy.context)
+            return
+        with span("baker_cleanup"):
+            baker_cleanup(self, context)
+
+
+def get_settings_key(context: Context) -> tuple:
+    gd = context.scene.gd
+    return tuple(getattr(gd, name) for name in SESSION_SETTINGS)
+
+
+active_session: BakeSession | None = None
+
+
+def begin_session(context: Context) -> BakeSession:
+    """Get the running bake session, starting one if there is none
+    or its settings are outdated, and mark it as in use"""
+    global active_session
+    if active_session is not None and (
+        active_session.scene_name != context.scene.name
+        or active_session.settings_key != get_settings_key(context)
+    ) and not active_session.users:
+        end_session(context)
+    if active_session is None:
+        active_session = BakeSession(context)
+    active_session.users += 1
+    return active_session
+
+
+def release_session(context: Context, session: BakeSession) -> None:
+    """Mark the session as unused by one holder, ending it once unused"""
+    # NOTE: Already ended, e.g. by a file being loaded
+    if session is not active_session:
+        return
+    session.users = max(session.users - 1, 0)
+    if not session.users:
+        end_session(context)
+
+
+def end_session(context: Context | None=None) -> None:
+    """Restore the original scene state of the running session"""
+    global active_session
+    if active_session is None:
+        return
+    session, active_session = active_session, None
+    session.end(context or bpy.context)
+
+
+# NOTE: Holders are told to stop rather than the
+# session ending, as undo reloads the data they use
+@persistent
+def undo_session_handler(*_args) -> None:
+    if active_session is not None:
+        active_session.is_interrupted = True
+
+
+@persistent
+def load_session_handler(*_args) -> None:
+    end_session()
+
+
+################################################
+# REGISTRATION
+################################################
+
+
+undo_handlers = (
+    bpy.app.handlers.undo_pre,
+    bpy.app.handlers.redo_pre
+)
+
+
+def register():
+    for handlers in undo_handlers:
+        handlers.append(undo_session_handler)
+    bpy.app.handlers.load_pre.append(load_session_handler)
+
+def unregister():
+    for handlers in undo_handlers:
+        if undo_session_handler in handlers:
+            handlers.remove(undo_session_handler)
+    if load_session_handler in bpy.app.handlers.load_pre:
+        bpy.app.handlers.load_pre.remove(load_session_handler)
+    end_session()
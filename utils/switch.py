@@ -0,0 +1,215 @@
+import bpy
+from bpy.types import NodeTree, Object
+
+from ..constants import Global
+from .node import (
+    node_init,
+    get_material_output_inputs,
+    get_material_index,
+    link_bsdf_inputs,
+    begin_journal_entries,
+    journal_output_links
+)
+
+
+# NOTE: Index of each map node group within the switch
+SWITCH_MAP_NODES = (
+    Global.NORMAL_NODE,
+    Global.CURVATURE_NODE,
+    Global.OCCLUSION_NODE,
+    Global.HEIGHT_NODE,
+    Global.ALPHA_NODE,
+    Global.COLOR_NODE,
+    Global.EMISSIVE_NODE,
+    Global.ROUGHNESS_NODE,
+    Global.METALLIC_NODE
+)
+SWITCH_INDEX_NAME = "Map Index"
+
+
+def is_switch_tree_valid(tree: NodeTree) -> bool:
+    """Check that every map node group nested in the switch still exists"""
+    for name in SWITCH_MAP_NODES:
+        node = tree.nodes.get(name)
+        if node is None or node.node_tree is None:
+            return False
+    return True
+
+
+def switch_node_init() -> NodeTree:
+    """Create the map switch node group, nesting every map node
+    group and selecting its shader output by a shared index"""
+    tree = bpy.data.node_groups.get(Global.SWITCH_NODE)
+    if tree is not None and is_switch_tree_valid(tree):
+        return tree
+    if tree is not None:
+        bpy.data.node_groups.remove(tree)
+    node_init()
+
+    tree = bpy.data.node_groups.new(Global.SWITCH_NODE, 'ShaderNodeTree')
+    tree.use_fake_user = True
+
+    # Create interface, saved links first then the union of map inputs
+    tree.interface.new_socket(
+        name="Shader", socket_type="NodeSocketShader", in_out='OUTPUT'
+    )
+    saved_links = tree.interface.new_panel(
+        name="Saved Links",
+        description="Stored links to restore original socket links later",
+        default_closed=True
+    )
+    inputs = get_material_output_inputs()
+    for name, socket_type in inputs.items():
+        tree.interface.new_socket(
+            name=name,
+            parent=saved_links,
+            socket_type=socket_type,
+            in_out='INPUT'
+        )
+    for name in SWITCH_MAP_NODES:
+        map_tree = bpy.data.node_groups[name]
+        for item in map_tree.interface.items_tree:
+            if item.item_type != 'SOCKET' or item.in_out != 'INPUT' \
+            or item.name in inputs or item.name in tree.interface.items_tree:
+                continue
+            socket = tree.interface.new_socket(
+                name=item.name,
+                socket_type=item.socket_type,
+                in_out='INPUT'
+            )
+            if hasattr(item, 'default_value'):
+                socket.default_value = item.default_value
+
+    # Create nodes
+    group_output = tree.nodes.new('NodeGroupOutput')
+    group_output.name = "Group Output"
+    group_output.location = (600, 0)
+    group_input = tree.nodes.new('NodeGroupInput')
+    group_input.name = "Group Input"
+    group_input.location = (-800, 0)
+
+    index = tree.nodes.new('ShaderNodeValue')
+    index.name = index.label = SWITCH_INDEX_NAME
+    index.location = (-800, 300)
+    index.outputs[0].default_value = 0
+
+    shader = None
+    for idx, name in enumerate(SWITCH_MAP_NODES):
+        map_node = tree.nodes.new('ShaderNodeGroup')
+        map_node.node_tree = bpy.data.node_groups[name]
+        map_node.name = name
+        map_node.location = (-400, -idx * 200)
+        for node_input in map_node.inputs:
+            if node_input.name in group_input.outputs:
+                tree.links.new(
+                    node_input, group_input.outputs[node_input.name]
+                )
+        if shader is None:
+            shader = map_node.outputs["Shader"]
+            continue
+
+        compare = tree.nodes.new('ShaderNodeMath')
+        compare.name = f"{name} Compare"
+        compare.operation = 'COMPARE'
+        compare.inputs[1].default_value = idx
+        compare.inputs[2].default_value = .5
+        compare.location = (-200, 200 - idx * 200)
+        tree.links.new(compare.inputs[0], index.outputs[0])
+
+        mix = tree.nodes.new('ShaderNodeMixShader')
+        mix.name = f"{name} Mix"
+        mix.location = (200, -idx * 200)
+        tree.links.new(mix.inputs[0], compare.outputs[0])
+        tree.links.new(mix.inputs[1], shader)
+        tree.links.new(mix.inputs[2], map_node.outputs["Shader"])
+        shader = mix.outputs[0]
+    tree.links.new(group_output.inputs["Shader"], shader)
+    return tree
+
+
+def set_switch_map(name: str) -> None:
+    """Show the given map node group in every switched material"""
+    tree = bpy.data.node_groups.get(Global.SWITCH_NODE)
+    if tree is None or name not in SWITCH_MAP_NODES:
+        return
+    tree.nodes[SWITCH_INDEX_NAME].outputs[0].default_value = \
+        SWITCH_MAP_NODES.index(name)
+
+
+def apply_switch_to_objects(objects: set[Object]) -> bool:
+    """Add the map switch node group once to all materials of the
+    given objects, saving the original output & BSDF input links.
+
+    Removed through `node_cleanup(Global.SWITCH_NODE)`"""
+    tree = switch_node_init()
+    operation_success = True
+    for material, entry in begin_journal_entries(
+            Global.SWITCH_NODE, get_material_index(objects)
+        ):
+        material.use_nodes = True
+        nodes = material.node_tree.nodes
+        links = material.node_tree.links
+
+        output_nodes = [
+            node for node in nodes if node.type == 'OUTPUT_MATERIAL'
+        ]
+        if not output_nodes:
+            output = nodes.new('ShaderNodeOutputMaterial')
+            entry["nodes"].append(output.name)
+            output_nodes.append(output)
+
+        for output in output_nodes:
+            journal_output_links(entry, output)
+
+            switch = nodes.new('ShaderNodeGroup')
+            switch.node_tree = tree
+            switch.name = Global.SWITCH_NODE
+            switch.hide = True
+            switch.location = (output.location[0], output.location[1] - 160)
+            entry["nodes"].append(switch.name)
+
+            GD_text = bpy.data.texts.get('_grabdoc_ng_warning')
+            if GD_text is None:
+                GD_text = bpy.data.texts.new(name='_grabdoc_ng_warning')
+                GD_text.write(Global.NG_NODE_WARNING)
+
+            GD_frame = nodes.new('NodeFrame')
+            GD_frame.location = (output.location[0], output.location[1] - 195)
+            GD_frame.name = Global.SWITCH_NODE
+            GD_frame.text = GD_text
+            GD_frame.width = 1000
+            GD_frame.height = 150
+            entry["nodes"].append(GD_frame.name)
+
+            for output_material_input in output.inputs:
+                for link in output_material_input.links:
+                    source_node = link.from_node
+                    try:
+                        links.new(
+                            switch.inputs[output_material_input.name],
+                            source_node.outputs[link.from_socket.name]
+                        )
+                    except KeyError:
+                        pass
+
+                    if "BSDF" not in source_node.type:
+                        continue
+                    # NOTE: Link the BSDF inputs of all maps at once
+                    found = [
+                        link_bsdf_inputs(name, switch, source_node, material)
+                        for name in Global.SHADER_MAP_NAMES
+                        if name != Global.NORMAL_NODE
+                    ]
+                    link_bsdf_inputs(
+                        Global.NORMAL_NODE, switch, source_node, material
+                    )
+                    if not any(found) \
+                    and material.name != Global.GD_MATERIAL_NAME:
+                        operation_success = False
+
+            for link in output.inputs['Volume'].links:
+                links.remove(link)
+            for link in output.inputs['Displacement'].links:
+                links.remove(link)
+            links.new(output.inputs["Surface"], switch.outputs["Shader"])
+    return operation_success
@@ -0,0 +1,124 @@
+import os
+import shutil
+
+import numpy
+import bpy
+from bpy.types import Context
+
+from .generic import get_create_addon_temp_dir
+
+# NOTE: Bundled with Blender, but not guaranteed for custom builds
+try:
+    import OpenImageIO as oiio
+except ImportError:
+    oiio = None
+
+
+def is_tiled_render_supported() -> bool:
+    return oiio is not None
+
+
+def get_tile_bounds(
+        width: int, height: int, tile_size: int
+    ) -> list[tuple[int, int, int, int]]:
+    """Split the given resolution into tile pixel bounds (x0, y0, x1, y1)
+    where Y starts at the bottom of the frame as in render borders"""
+    return [
+        (x0, y0, min(x0 + tile_size, width), min(y0 + tile_size, height))
+        for y0 in range(0, height, tile_size)
+        for x0 in range(0, width, tile_size)
+    ]
+
+
+def set_render_border(
+        context: Context, bounds: tuple[int, int, int, int]
+    ) -> None:
+    """Set the camera border region to the given tile pixel bounds"""
+    render = context.scene.render
+    x0, y0, x1, y1 = bounds
+    # NOTE: Border pixels are truncated, offset by half a
+    # pixel so float precision never loses a whole pixel
+    render.border_min_x = (x0 + .5) / render.resolution_x
+    render.border_min_y = (y0 + .5) / render.resolution_y
+    render.border_max_x = min(1, (x1 + .5) / render.resolution_x)
+    render.border_max_y = min(1, (y1 + .5) / render.resolution_y)
+
+
+def render_tiled(context: Context, path: str, tile_size: int) -> str:
+    """Render the trim camera in tiles, stream every tile into a memory
+    mapped canvas and encode the canvas to the given path scanline-wise.
+
+    Peak memory is bounded by the tile size rather than the resolution"""
+    render = context.scene.render
+    width = render.resolution_x
+    height = render.resolution_y
+
+    saved_path = render.filepath
+    saved_use_border = render.use_border
+    saved_crop = render.use_crop_to_border
+    saved_border = (
+        render.border_min_x, render.border_min_y,
+        render.border_max_x, render.border_max_y
+    )
+
+    temp_path = os.path.join(get_create_addon_temp_dir()[1], "tiles")
+    os.makedirs(temp_path, exist_ok=True)
+    tile_path = os.path.join(temp_path, "tile" + os.path.splitext(path)[1])
+    canvas_path = os.path.join(temp_path, "canvas.raw")
+
+    render.use_border = True
+    render.use_crop_to_border = True
+    render.filepath = tile_path
+
+    canvas = None
+    spec = None
+    try:
+        for bounds in get_tile_bounds(width, height, tile_size):
+            set_render_border(context, bounds)
+            bpy.ops.render.render(write_still=True)
+
+            tile = oiio.ImageInput.open(tile_path)
+            tile_spec = tile.spec()
+            pixels = tile.read_image(
+                0, 0, 0, tile_spec.nchannels, tile_spec.format
+            )
+            tile.close()
+
+            # Create canvas from the first tile's data type and channels
+            if canvas is None:
+                spec = oiio.ImageSpec(tile_spec)
+                spec.width = spec.full_width = width
+                spec.height = spec.full_height = height
+                spec.x = spec.y = spec.full_x = spec.full_y = 0
+                canvas = numpy.memmap(
+                    canvas_path,
+                    dtype=pixels.dtype,
+                    mode='w+',
+                    shape=(height, width, spec.nchannels)
+                )
+
+            # NOTE: Image rows start at the top, borders at the bottom
+            x0, y0 = bounds[:2]
+            tile_height, tile_width = pixels.shape[:2]
+            row = max(0, height - y0 - tile_height)
+            canvas[row:row + tile_height, x0:x0 + tile_width] = \
+                pixels.reshape(tile_height, tile_width, -1)
+            del pixels
+        canvas.flush()
+
+        output = oiio.ImageOutput.create(path)
+        output.open(path, spec)
+        for row in range(0, height, tile_size):
+            row_end = min(row + tile_size, height)
+            output.write_scanlines(row, row_end, 0, canvas[row:row_end])
+        output.close()
+    finally:
+        del canvas
+        shutil.rmtree(temp_path, ignore_errors=True)
+
+        render.filepath = saved_path
+        render.use_border = saved_use_border
+        render.use_crop_to_border = saved_crop
+        render.border_min_x, render.border_min_y, \
+        render.border_max_x, render.border_max_y = saved_border
+    return path
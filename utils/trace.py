@@ -0,0 +1,156 @@
+import os
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+# NOTE: Not bundled with Blender, used when installed
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def get_rss() -> int:
+    """Get the resident set size of this process in bytes, 0 if unknown"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    if sys.platform.startswith('linux'):
+        try:
+            with open("/proc/self/statm", encoding='utf-8') as file:
+                return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError):
+            return 0
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t)
+            ]
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        ctypes.windll.psapi.GetProcessMemoryInfo(
+            ctypes.windll.kernel32.GetCurrentProcess(),
+            ctypes.byref(counters),
+            counters.cb
+        )
+        return counters.WorkingSetSize
+    # NOTE: macOS, peak instead of current RSS (bytes)
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except ImportError:
+        return 0
+
+
+class Tracer():
+    """Collects timed spans of an export in the Chrome trace event format"""
+
+    def __init__(self):
+        self.events = []
+        self.start = time.perf_counter()
+        self.pid = os.getpid()
+
+    def timestamp(self) -> float:
+        """Microseconds since the trace started"""
+        return (time.perf_counter() - self.start) * 1e6
+
+    @contextmanager
+    def span(self, name: str, **args):
+        rss_begin = get_rss()
+        begin = self.timestamp()
+        try:
+            yield
+        finally:
+            end = self.timestamp()
+            rss_end = get_rss()
+            self.events.append({
+                "name": name,
+                "ph": "X",
+                "ts": begin,
+                "dur": end - begin,
+                "pid": self.pid,
+                "tid": threading.get_ident(),
+                "args": {
+                    **args, "rss_begin": rss_begin, "rss_end": rss_end
+                }
+            })
+            self.events.append({
+                "name": "RSS",
+                "ph": "C",
+                "ts": end,
+                "pid": self.pid,
+                "args": {"MB": round(rss_end / 1048576, 1)}
+            })
+
+    def write(self, path: str) -> str:
+        with open(path, "w", encoding='utf-8') as file:
+            json.dump(
+                {"traceEvents": self.events, "displayTimeUnit": "ms"}, file
+            )
+        return path
+
+    def summary(self) -> list[tuple[str, int, float, float]]:
+        """Get (name, count, total seconds, peak RSS MB) of
+        every span name, sorted by total time descending"""
+        totals = {}
+        for event in self.events:
+            if event["ph"] != "X":
+                continue
+            count, total, rss = totals.get(event["name"], (0, 0, 0))
+            totals[event["name"]] = (
+                count + 1,
+                total + event["dur"] / 1e6,
+                max(rss, event["args"]["rss_end"] / 1048576)
+            )
+        return sorted(
+            ((name, *values) for name, values in totals.items()),
+            key=lambda item: item[2],
+            reverse=True
+        )
+
+
+# NOTE: Spans are no-ops outside of an active trace
+active_tracer: Tracer | None = None
+last_summary: list[tuple[str, int, float, float]] = []
+
+
+def start_trace() -> Tracer:
+    global active_tracer
+    active_tracer = Tracer()
+    return active_tracer
+
+
+def end_trace(path: str | None=None) -> Tracer | None:
+    """Stop the active trace, keeping its summary for the UI
+    and writing the trace file if a path is given"""
+    global active_tracer, last_summary
+    tracer = active_tracer
+    active_tracer = None
+    if tracer is None:
+        return None
+    last_summary = tracer.summary()
+    if path is not None:
+        tracer.write(path)
+    return tracer
+
+
+@contextmanager
+def span(name: str, **args):
+    if active_tracer is None:
+        yield
+        return
+    with active_tracer.span(name, **args):
+        yield
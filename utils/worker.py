@@ -0,0 +1,205 @@
+import os
+import sys
+import shutil
+import argparse
+import subprocess
+from typing import Iterable
+
+import bpy
+from bpy.types import Context
+
+from .generic import get_create_addon_temp_dir
+from .baker import Baker, get_bake_maps
+
+
+# NOTE: Name of the add-on package, e.g. `GrabDoc`
+ADDON_PACKAGE = __package__.rsplit('.', maxsplit=1)[0]
+
+
+def get_blender_command(
+        module_name: str,
+        blend_path: str | None=None,
+        blender_args: Iterable[str]=(),
+        script_args: Iterable[str]=()
+    ) -> list[str]:
+    """Get the command line of a background Blender process
+    that runs the `main` function of the given add-on module"""
+    args = [bpy.app.binary_path, "-b", "--addons", ADDON_PACKAGE]
+    if blend_path is not None:
+        args.append(blend_path)
+    args.extend(blender_args)
+    args.extend((
+        "--python-expr",
+        f"import importlib; importlib.import_module('{module_name}').main()",
+        "--",
+        *script_args
+    ))
+    return args
+
+
+class ExportWorker():
+    """A background Blender process exporting a subset of bake maps"""
+
+    def __init__(
+            self,
+            map_ids: list[str],
+            output_dir: str,
+            log_path: str,
+            progress_path: str
+        ):
+        self.map_ids = map_ids
+        self.output_dir = output_dir
+        self.log_path = log_path
+        self.progress_path = progress_path
+        self.process = None
+
+    def start(self, snapshot_path: str, threads: int) -> None:
+        os.makedirs(self.output_dir, exist_ok=True)
+        args = get_blender_command(
+            __name__,
+            blend_path=snapshot_path,
+            blender_args=("-t", str(threads)),
+            script_args=(
+                "--maps", ",".join(self.map_ids),
+                "--output", self.output_dir,
+                "--progress", self.progress_path
+            )
+        )
+        with open(self.log_path, "w", encoding='utf-8') as log:
+            self.process = subprocess.Popen(
+                args, stdout=log, stderr=subprocess.STDOUT
+            )
+
+    def is_running(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def succeeded(self) -> bool:
+        return self.process is not None and self.process.poll() == 0
+
+    def exported_files(self) -> list[str]:
+        if not os.path.exists(self.output_dir):
+            return []
+        return [
+            os.path.join(self.output_dir, name)
+            for name in os.listdir(self.output_dir)
+        ]
+
+    def completed_maps(self) -> list[str]:
+        """Get the maps whose files the worker finished writing"""
+        if not os.path.exists(self.progress_path):
+            return []
+        with open(self.progress_path, encoding='utf-8') as file:
+            return [line for line in file.read().splitlines() if line]
+
+    def terminate(self, timeout: float=5) -> None:
+        if not self.is_running():
+            return
+        self.process.terminate()
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+def get_worker_temp_dir() -> str:
+    temp_path = os.path.join(get_create_addon_temp_dir()[1], "workers")
+    os.makedirs(temp_path, exist_ok=True)
+    return temp_path
+
+
+def get_worker_thread_count(worker_count: int, threads: int=0) -> int:
+    """Get the render thread budget of each worker,
+    splitting all CPU cores evenly if not given"""
+    if threads:
+        return threads
+    return max(1, (os.cpu_count() or 1) // worker_count)
+
+
+def start_export_workers(
+        context: Context,
+        bake_maps: list[Baker],
+        worker_count: int,
+        threads: int=0
+    ) -> list[ExportWorker]:
+    """Save a snapshot of the current file and spawn background
+    Blender processes that each export a subset of the bake maps"""
+    temp_path = get_worker_temp_dir()
+    shutil.rmtree(temp_path, ignore_errors=True)
+    os.makedirs(temp_path)
+
+    snapshot_path = os.path.join(temp_path, "snapshot.blend")
+    bpy.ops.wm.save_as_mainfile(
+        filepath=snapshot_path, copy=True, check_existing=False
+    )
+
+    # Distribute maps round-robin
+    worker_count = max(1, min(worker_count, len(bake_maps)))
+    map_ids = [[] for _ in range(worker_count)]
+    for idx, bake_map in enumerate(bake_maps):
+        map_ids[idx % worker_count].append(bake_map.ID)
+
+    threads = get_worker_thread_count(worker_count, threads)
+    workers = []
+    for idx, worker_map_ids in enumerate(map_ids):
+        worker = ExportWorker(
+            worker_map_ids,
+            output_dir=os.path.join(temp_path, f"worker_{idx}"),
+            log_path=os.path.join(temp_path, f"worker_{idx}.log"),
+            progress_path=os.path.join(temp_path, f"worker_{idx}.progress")
+        )
+        worker.start(snapshot_path, threads)
+        workers.append(worker)
+    return workers
+
+
+def gather_worker_outputs(
+        context: Context, workers: list[ExportWorker]
+    ) -> list[str]:
+    """Move all files exported by workers into the export path"""
+    export_path = bpy.path.abspath(context.scene.gd.export_path)
+    paths = []
+    for worker in workers:
+        for file_path in worker.exported_files():
+            path = os.path.join(export_path, os.path.basename(file_path))
+            shutil.move(file_path, path)
+            paths.append(path)
+    return paths
+
+
+def stop_export_workers(workers: list[ExportWorker]) -> None:
+    """Terminate all running workers and remove their files"""
+    for worker in workers:
+        worker.terminate()
+    remove_worker_temp_dir()
+
+
+def remove_worker_temp_dir() -> None:
+    shutil.rmtree(get_worker_temp_dir(), ignore_errors=True)
+
+
+def main() -> None:
+    """Entry point of a background export worker
+
+    Exports the given maps of the opened snapshot into the output directory"""
+    argv = sys.argv[sys.argv.index("--") + 1:]
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--maps", required=True)
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--progress", default="")
+    args = parser.parse_args(argv)
+
+    gd = bpy.context.scene.gd
+    gd.export_path = args.output
+    # NOTE: Handled by the main process once all workers finish
+    gd.use_pack_maps = False
+    gd.export_plane = False
+    # NOTE: Outputs are moved afterwards, a manifest would be stale
+    gd.use_export_cache = False
+    for bake_map in get_bake_maps(enabled_only=False):
+        bake_map.reimport = False
+
+    result = bpy.ops.grab_doc.export_maps(
+        map_ids=args.maps, progress_path=args.progress
+    )
+    sys.exit(0 if 'FINISHED' in result else 1)